@@ -20,6 +20,28 @@ forecasts alongside observations.
 
 .. automodule:: forest.load
 
+.. automodule:: forest.cache
+
+.. automodule:: forest.prefetch
+
+.. automodule:: forest.pyramid
+
+.. automodule:: forest.quantise
+
+.. automodule:: forest.sidecar
+
+.. automodule:: forest.catalogue
+
+.. automodule:: forest.series_store
+
+.. automodule:: forest.earth_networks
+
+.. automodule:: forest.handles
+
+.. automodule:: forest.db.explain
+
+.. automodule:: forest.db.benchmark
+
 """
 __version__ = '0.4.4'
 
@@ -0,0 +1,160 @@
+"""
+Memory bounded caches
+---------------------
+
+Long running servers share loaded data between
+documents. To prevent unbounded growth the cache
+keeps track of the number of bytes held by its
+entries and evicts the least recently used items
+when the limit is exceeded.
+
+.. autoclass:: LRUCache
+    :members:
+
+.. autofunction:: nbytes
+
+"""
+import threading
+from collections import OrderedDict, namedtuple
+import numpy as np
+
+
+CacheInfo = namedtuple("CacheInfo", (
+    "hits",
+    "misses",
+    "evictions",
+    "max_bytes",
+    "nbytes",
+    "size"))
+
+
+def nbytes(obj):
+    """Estimate memory held by arrays inside a value
+
+    Arrays nested inside dicts, lists and tuples are included,
+    masked arrays count both their data and mask. Other objects
+    may report their size with an ``nbytes`` attribute
+
+    :returns: number of bytes
+    """
+    if isinstance(obj, np.ma.MaskedArray):
+        return obj.data.nbytes + np.ma.getmaskarray(obj).nbytes
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sum(nbytes(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(nbytes(value) for value in obj)
+    return getattr(obj, "nbytes", 0)
+
+
+class LRUCache(object):
+    """Least recently used cache with a byte budget
+
+    Supports a subset of the dict interface so that it can replace
+    module level dictionaries used as caches
+
+    >>> images = LRUCache(max_bytes=1024**3)
+    >>> images[key] = image
+    >>> images.get(key)
+
+    .. note:: A ``max_bytes`` of None disables eviction
+
+    .. note:: Entries may be added from worker threads, e.g.
+              by :class:`forest.prefetch.Prefetch`
+
+    :param max_bytes: memory budget in bytes
+    :param sizeof: function to measure entries, default :func:`nbytes`
+    """
+    def __init__(self, max_bytes=None, sizeof=nbytes):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.RLock()
+
+    def resize(self, max_bytes):
+        """Change memory budget, evicting entries if necessary"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __getitem__(self, key):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                raise
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get(self, key, default=None):
+        """Look up key, counting hits and misses"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if (self.max_bytes is not None) and (size > self.max_bytes):
+                # Entry can never fit, do not flush everything else
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self.nbytes += size
+            self._evict()
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        del self._entries[key]
+        self.nbytes -= self._sizes.pop(key)
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        while self.nbytes > self.max_bytes:
+            key, _ = self._entries.popitem(last=False)
+            self.nbytes -= self._sizes.pop(key)
+            self.evictions += 1
+
+    def clear(self):
+        """Remove all entries, counters are preserved"""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+
+    def info(self):
+        """Cache statistics
+
+        :returns: CacheInfo(hits, misses, evictions, max_bytes, nbytes, size)
+        """
+        with self._lock:
+            return CacheInfo(
+                    self.hits,
+                    self.misses,
+                    self.evictions,
+                    self.max_bytes,
+                    self.nbytes,
+                    len(self._entries))
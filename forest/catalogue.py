@@ -0,0 +1,106 @@
+"""
+Initial time catalogue
+----------------------
+
+Unified model locators group files by initial time. When a file
+name does not contain its initial time the file is opened to read
+``forecast_reference_time``, which is slow for thousands of files
+on network storage. The catalogue reads those files in parallel
+once per process and shares the answers between locators and
+sessions.
+
+>>> times = catalogue.initial_times(paths)
+>>> times[path]
+datetime.datetime(2019, 1, 1, 0, 0)
+
+.. note:: netCDF-C is not thread-safe, see
+          :data:`forest.util.NETCDF_LOCK`, so files are opened in
+          worker processes rather than threads
+
+.. autofunction:: initial_times
+
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import netCDF4
+from forest.util import initial_time as _initial_time, NETCDF_LOCK
+
+
+#: Number of worker processes used to open files
+WORKERS = 8
+
+#: Files read in the calling process below this number
+MIN_PARALLEL = 64
+
+#: Initial times read from files, keyed on path with the
+#: modification time and size at the time of reading
+INITIAL_TIMES = {}
+_LOCK = threading.Lock()
+
+
+def initial_times(paths, workers=WORKERS):
+    """Initial time of each path
+
+    Times are parsed from file names if possible, otherwise read
+    from ``forecast_reference_time`` in ``workers`` processes and
+    remembered until the file changes
+
+    :returns: dict of path to initial time or None if not found
+    """
+    start = time.time()
+    result = {}
+    unread = []
+    for path in paths:
+        value = _initial_time(path)
+        if value is not None:
+            result[path] = value
+            continue
+        stat = _stat(path)
+        with _LOCK:
+            cached = INITIAL_TIMES.get(path)
+        if (cached is not None) and (cached[0] == stat):
+            result[path] = cached[1]
+        else:
+            unread.append((path, stat))
+    if len(unread) == 0:
+        return result
+    names = [path for path, _ in unread]
+    if (workers > 1) and (len(unread) >= MIN_PARALLEL):
+        chunksize = max(1, len(unread) // (4 * workers))
+        # Forking a process that holds locks in other threads may
+        # deadlock, start clean interpreters instead
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+                max_workers=workers, mp_context=context) as executor:
+            values = list(executor.map(
+                reference_time, names, chunksize=chunksize))
+    else:
+        values = [reference_time(path) for path in names]
+    with _LOCK:
+        for (path, stat), value in zip(unread, values):
+            INITIAL_TIMES[path] = (stat, value)
+            result[path] = value
+    print("catalogue: read {} of {} files in {:.2f}s".format(
+        len(unread), len(paths), time.time() - start))
+    return result
+
+
+def _stat(path):
+    try:
+        result = os.stat(path)
+    except OSError:
+        return None
+    return result.st_mtime, result.st_size
+
+
+def reference_time(path):
+    """Read forecast_reference_time from a file, None if not present"""
+    with NETCDF_LOCK, netCDF4.Dataset(path) as dataset:
+        try:
+            var = dataset.variables["forecast_reference_time"]
+        except KeyError:
+            return None
+        return netCDF4.num2date(var[:], units=var.units)
@@ -206,14 +206,20 @@ class SourceLimits(Observable):
         super().__init__()
 
     def on_change(self, attr, old, new):
-        images = []
+        lows, highs = [], []
         for source in self.sources:
             if len(source.data["image"]) == 0:
                 continue
-            images.append(source.data["image"][0])
-        if len(images) > 0:
-            low = np.min([np.min(x) for x in images])
-            high = np.max([np.max(x) for x in images])
+            if "min" in source.data:
+                # Quantised images, see forest.quantise
+                lows.append(source.data["min"][0])
+                highs.append(source.data["max"][0])
+            else:
+                lows.append(np.min(source.data["image"][0]))
+                highs.append(np.max(source.data["image"][0]))
+        if len(lows) > 0:
+            low = np.min(lows)
+            high = np.max(highs)
             self.notify(set_source_limits(low, high))
         else:
             self.notify(set_source_limits(0, 1))
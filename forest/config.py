@@ -74,6 +74,19 @@ class Config(object):
                     for f in self.data["files"]]
         return []
 
+    @property
+    def image_cache_mb(self):
+        """Memory budget in MB of the shared image cache
+
+        .. code-block:: yaml
+
+            image_cache_mb: 2048
+
+        :returns: number or None if not specified, in which case
+                  :data:`forest.data.DEFAULT_IMAGE_CACHE_MB` applies
+        """
+        return self.data.get("image_cache_mb", None)
+
     @classmethod
     def load(cls, path, variables=None):
         """Parse settings from either YAML or JSON file on disk
@@ -23,9 +23,13 @@ from forest import (
         rdt,
         earth_networks,
         geo,
-        disk)
+        disk,
+        pyramid)
+from forest.cache import LRUCache
 import bokeh.models
+import threading
 from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from functools import partial
 import scipy.ndimage
 try:
@@ -36,13 +40,19 @@ except ImportError:
 from forest.util import (
         timeout_cache,
         initial_time,
-        coarsify)
+        NETCDF_LOCK)
 from forest.exceptions import SearchFail
 
 
+#: Memory budget of IMAGES unless --image-cache-mb or config says otherwise
+DEFAULT_IMAGE_CACHE_MB = 1024
+
 # Application data shared across documents
 LOADERS = {}
-IMAGES = OrderedDict()
+EXECUTORS = {}
+IMAGES = LRUCache(max_bytes=DEFAULT_IMAGE_CACHE_MB * 1024**2)
+PENDING = {}  # Futures of in-flight loads keyed by image_key
+_PENDING_LOCK = threading.Lock()
 VECTORS = OrderedDict()
 COASTLINES = {
     "xs": [],
@@ -87,6 +97,44 @@ def on_server_loaded():
             '50m').geometries()))
 
 
+def set_image_cache_size(megabytes):
+    """Limit memory used by shared IMAGES cache
+
+    :param megabytes: budget in MB, None removes the limit
+    """
+    if megabytes is None:
+        IMAGES.resize(None)
+    else:
+        IMAGES.resize(int(float(megabytes) * 1024**2))
+
+
+def log_image_cache():
+    """Print IMAGES statistics, called periodically by the server"""
+    info = IMAGES.info()
+    if info.max_bytes is None:
+        budget = "unlimited"
+    else:
+        budget = "{:.0f} MB".format(info.max_bytes / 1024**2)
+    print("IMAGES: {} entries, {:.0f} MB of {}, "
+          "{} hits, {} misses, {} evictions".format(
+              info.size,
+              info.nbytes / 1024**2,
+              budget,
+              info.hits,
+              info.misses,
+              info.evictions))
+
+
+def shared_executor(name, max_workers):
+    """Thread pool shared across documents
+
+    .. note:: max_workers only applies to the first call for each name
+    """
+    if name not in EXECUTORS:
+        EXECUTORS[name] = ThreadPoolExecutor(max_workers=max_workers)
+    return EXECUTORS[name]
+
+
 def add_loader(name, loader):
     global LOADERS
     if name not in LOADERS:
@@ -265,31 +313,31 @@ class WindBarbs(ActiveViewer):
 
 
 class DBLoader(object):
+    #: image(state, viewport) serves detail for the visible extent
+    zoomable = True
+
     def __init__(self, name, pattern, locator):
         self.name = name
         self.pattern = pattern
         self.locator = locator
 
-    def image(self, state):
-        if not self.valid(state):
-            return gridded_forecast.empty_image()
+    def image(self, state, viewport=None):
+        """Image and meta-data of field described by state
 
-        try:
-            path, pts = self.locator.locate(
-                self.pattern,
-                state.variable,
-                state.initial_time,
-                state.valid_time,
-                state.pressure)
-        except SearchFail:
+        :param viewport: optional :class:`forest.pyramid.Viewport` used
+                         to select resolution and extent
+        """
+        found = self.locate(state)
+        if found is None:
             return gridded_forecast.empty_image()
+        path, pts = found
 
         units = self.read_units(path, state.variable)
-        data = load_image_pts(
+        data = load_pyramid(
                 path,
                 state.variable,
                 pts,
-                pts)
+                pts).image(viewport)
         if (len(state.pressures) > 0) and (state.pressure is not None):
             level = "{} hPa".format(int(state.pressure))
         else:
@@ -302,13 +350,29 @@ class DBLoader(object):
         data["units"] = [units]
         return data
 
+    def locate(self, state):
+        """Find file and indices of field described by state
+
+        :returns: (path, pts) or None if state can not be located
+        """
+        if not self.valid(state):
+            return
+        try:
+            return self.locator.locate(
+                self.pattern,
+                state.variable,
+                state.initial_time,
+                state.valid_time,
+                state.pressure)
+        except SearchFail:
+            return
+
     @staticmethod
     def read_units(filename,parameter):
-        dataset = netCDF4.Dataset(filename)
-        veep = dataset.variables[parameter]
-        # read the units and assign a blank value if there aren't any:
-        units = getattr(veep, 'units', '')
-        dataset.close()
+        with NETCDF_LOCK, netCDF4.Dataset(filename) as dataset:
+            veep = dataset.variables[parameter]
+            # read the units and assign a blank value if there aren't any:
+            units = getattr(veep, 'units', '')
         return units
 
 
@@ -396,15 +460,54 @@ def load_image(path, variable, itime, ipressure):
     return load_image_pts(path, variable, (itime,), (itime, ipressure))
 
 
+def image_key(path, variable, pts_3d, pts_4d):
+    """Key used to store images in IMAGES cache"""
+    return (path, variable, pts_hash(pts_3d), pts_hash(pts_4d))
+
+
 def load_image_pts(path, variable, pts_3d, pts_4d):
-    key = (path, variable, pts_hash(pts_3d), pts_hash(pts_4d))
-    if key in IMAGES:
-        return IMAGES[key]
+    """Image of the full extent at a default resolution"""
+    return load_pyramid(path, variable, pts_3d, pts_4d).image()
+
+
+def load_pyramid(path, variable, pts_3d, pts_4d):
+    """Multi-resolution image stored in IMAGES cache
+
+    :returns: :class:`forest.pyramid.Pyramid`
+    """
+    key = image_key(path, variable, pts_3d, pts_4d)
+    image = IMAGES.get(key)
+    if image is not None:
+        return image
+
+    # Wait for a load already in progress, e.g. by a prefetch worker
+    with _PENDING_LOCK:
+        future = PENDING.get(key)
+        if future is None:
+            PENDING[key] = Future()
+    if future is not None:
+        return future.result()
+
+    future = PENDING[key]
+    try:
+        image = _load_pyramid(path, variable, pts_3d, pts_4d)
+    except Exception as e:
+        future.set_exception(e)
+        raise
     else:
-        try:
-            lons, lats, values, units = _load_netcdf4(path, variable, pts_3d, pts_4d)
-        except:
-            lons, lats, values, units = _load_cube(path, variable, pts_3d, pts_4d)
+        IMAGES[key] = image
+        future.set_result(image)
+        return image
+    finally:
+        with _PENDING_LOCK:
+            del PENDING[key]
+
+
+def _load_pyramid(path, variable, pts_3d, pts_4d):
+    try:
+        lons, lats, values, units = _load_netcdf4(path, variable, pts_3d, pts_4d)
+    except:
+        lons, lats, values, units = _load_cube(path, variable, pts_3d, pts_4d)
 
     # Units
     if variable in ["precipitation_flux", "stratiform_rainfall_rate"]:
@@ -415,21 +518,15 @@ def load_image_pts(path, variable, pts_3d, pts_4d):
     elif units == "K":
         values = convert_units(values, "K", "Celsius")
 
-    # Coarsify images
-    threshold = 200 * 200  # Chosen since TMA WRF is 199 x 199
-    if values.size > threshold:
-        fraction = 0.25
-    else:
-        fraction = 1.
-    lons, lats, values = coarsify(
-        lons, lats, values, fraction)
-
-    image = geo.stretch_image(lons, lats, values)
-    IMAGES[key] = image
-    return image
+    return pyramid.Pyramid(geo.stretch_image(lons, lats, values))
 
 
 def _load_cube(path, variable, pts_3d, pts_4d):
+    with NETCDF_LOCK:
+        return _read_cube(path, variable, pts_3d, pts_4d)
+
+
+def _read_cube(path, variable, pts_3d, pts_4d):
     import iris
     cube = iris.load_cube(path, iris.Constraint(variable))
     units = cube.units
@@ -447,7 +544,7 @@ def _load_cube(path, variable, pts_3d, pts_4d):
 
 
 def _load_netcdf4(path, variable, pts_3d, pts_4d):
-    with netCDF4.Dataset(path) as dataset:
+    with NETCDF_LOCK, netCDF4.Dataset(path) as dataset:
         try:
             var = dataset.variables[variable]
         except KeyError as e:
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Locate benchmark
+----------------
+
+Build synthetic in-memory databases of increasing size and time
+:meth:`forest.db.Locator.locate`. With the indexes created by
+:meth:`forest.db.Database.migrate` latency should stay roughly
+flat as the number of files grows.
+
+.. code-block:: sh
+
+   python -m forest.db.benchmark --files 1000 10000 100000
+
+.. autofunction:: benchmark
+
+"""
+import argparse
+import datetime as dt
+import time
+from . import database as db
+from .locate import Locator
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="time Locator.locate against synthetic databases")
+    parser.add_argument(
+        "--files", nargs="+", type=int, default=[1000, 10000, 100000],
+        metavar="N", help="number of files in each database")
+    parser.add_argument(
+        "--repeat", type=int, default=100, metavar="N",
+        help="number of locate calls to time")
+    return parser.parse_args(args=argv)
+
+
+def main(argv=None):
+    args = parse_args(argv=argv)
+    for count in args.files:
+        seconds = benchmark(count, repeat=args.repeat)
+        print("{:>8d} files: {:.3f} ms per locate".format(
+            count, 1000 * seconds))
+
+
+def benchmark(count, repeat=100, variables=4, times=4, pressures=3):
+    """Average time taken to locate a field in a database of count files
+
+    Each file holds a forecast cycle six hours after the previous one,
+    so the number of distinct valid times grows with the archive
+
+    :returns: seconds per call
+    """
+    database = db.Database.connect(":memory:")
+    start = dt.datetime(2019, 1, 1)
+    for i in range(count):
+        reference = start + dt.timedelta(hours=6 * i)
+        database.insert_metadata(db.FileMetadata(
+            "file_{}.nc".format(i),
+            str(reference),
+            [db.VariableMetadata(
+                "variable_{}".format(j),
+                0,
+                1,
+                [str(reference + dt.timedelta(hours=k))
+                 for k in range(times)],
+                [1000. - 100. * k for k in range(pressures)])
+             for j in range(variables)]))
+    database.connection.commit()
+
+    step = max(1, count // repeat)
+    samples = list(range(0, count, step))[:repeat]
+    tick = time.perf_counter()
+    for i in samples:
+        reference = start + dt.timedelta(hours=6 * i)
+        # New locator per call so that cached results are not timed
+        locator = Locator(database.connection)
+        locator.locate(
+            "file_*.nc",
+            "variable_0",
+            str(reference),
+            str(reference + dt.timedelta(hours=1)),
+            pressure=1000.)
+    seconds = (time.perf_counter() - tick) / len(samples)
+    database.close()
+    return seconds
+
+
+if __name__ == '__main__':
+    main()
@@ -7,9 +7,12 @@ class Connection(object):
         self.cursor = self.connection.cursor()
 
     @classmethod
-    def connect(cls, path):
-        """Create database instance from location on disk or :memory:"""
-        return cls(sqlite3.connect(path))
+    def connect(cls, path, **kwargs):
+        """Create database instance from location on disk or :memory:
+
+        .. note:: keyword arguments are passed to :func:`sqlite3.connect`
+        """
+        return cls(sqlite3.connect(path, **kwargs))
 
     def __enter__(self):
         return self
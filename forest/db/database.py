@@ -3,8 +3,11 @@ try:
 except ImportError:
     # ReadTheDocs can't install iris
     pass
+from collections import namedtuple
+import numpy as np
 import netCDF4
 import jinja2
+from forest import disk
 from .connection import Connection
 
 
@@ -14,6 +17,195 @@ __all__ = [
 ]
 
 
+FileMetadata = namedtuple("FileMetadata", (
+    "path",
+    "reference_time",
+    "variables"))
+
+
+VariableMetadata = namedtuple("VariableMetadata", (
+    "name",
+    "time_axis",
+    "pressure_axis",
+    "times",
+    "pressures"))
+
+
+def extract_metadata(path):
+    """Coordinate and meta-data information needed to index a file
+
+    Reading a file does not touch the database, so metadata can be
+    extracted in worker processes and inserted by a single writer.
+    Files are read with netCDF4 directly, files that do not follow
+    the naming conventions understood by :mod:`forest.disk` are read
+    with iris instead
+
+    :returns: :class:`FileMetadata` made of strings, numbers and lists
+    """
+    try:
+        return netcdf_metadata(path)
+    except Exception:
+        return iris_metadata(path)
+
+
+def netcdf_metadata(path):
+    """Equivalent of :func:`iris_metadata` using only netCDF4
+
+    Data variables are those iris would load as cubes, i.e. variables
+    that are not dimension coordinates or referenced by another
+    variable's coordinates, bounds or grid_mapping attributes
+
+    :raises ValueError: if time or pressure coordinates are not named
+                        after their standard names
+    """
+    with netCDF4.Dataset(path) as dataset:
+        reference_time = _reference_time(dataset)
+        variables = []
+        for name in _data_variables(dataset):
+            var = dataset.variables[name]
+            dims = var.dimensions
+            coords = getattr(var, "coordinates", "")
+            _check_coordinates(dataset, dims, coords)
+            time_axis, times = _coordinate(dataset, "time", dims, coords)
+            pressure_axis, pressures = _coordinate(
+                    dataset, "pressure", dims, coords)
+            if times is None:
+                times = []
+            else:
+                times = [str(t) for t in netCDF4.num2date(
+                    np.ravel(times[:]),
+                    units=times.units,
+                    calendar=getattr(times, "calendar", "standard"))]
+            if pressures is None:
+                pressures = []
+            else:
+                pressures = [float(p) for p in np.ravel(pressures[:])]
+            variables.append(VariableMetadata(
+                name,
+                time_axis,
+                pressure_axis,
+                times,
+                pressures))
+    return FileMetadata(path, reference_time, sorted(variables))
+
+
+def iris_metadata(path):
+    """Coordinate and meta-data information read with iris"""
+    with netCDF4.Dataset(path) as dataset:
+        reference_time = _reference_time(dataset)
+
+    variables = []
+    for cube in iris.load(path):
+        try:
+            times = [str(cell.point) for cell in cube.coord('time').cells()]
+        except iris.exceptions.CoordinateNotFoundError:
+            times = []
+        try:
+            pressures = [float(cell.point)
+                         for cell in cube.coord('pressure').cells()]
+        except iris.exceptions.CoordinateNotFoundError:
+            pressures = []
+        variables.append(VariableMetadata(
+            cube.var_name,
+            _axis(cube, 'time'),
+            _axis(cube, 'pressure'),
+            times,
+            pressures))
+    # iris.load order varies between runs, sort to give stable row ids
+    return FileMetadata(path, reference_time, sorted(variables))
+
+
+def _reference_time(dataset):
+    try:
+        obj = dataset.variables["forecast_reference_time"]
+    except KeyError:
+        return None
+    return str(netCDF4.num2date(obj[:], units=obj.units))
+
+
+def _data_variables(dataset):
+    referenced = set(dataset.dimensions)
+    for var in dataset.variables.values():
+        referenced.update(getattr(var, "coordinates", "").split())
+        for attr in ("bounds", "climatology", "grid_mapping"):
+            if hasattr(var, attr):
+                referenced.add(getattr(var, attr))
+    return [name for name in dataset.variables
+            if name not in referenced]
+
+
+def _check_coordinates(dataset, dims, coords):
+    # Coordinates recognised by iris via standard_name only
+    for name in list(dims) + coords.split():
+        if name not in dataset.variables:
+            continue
+        standard_name = getattr(dataset.variables[name], "standard_name", "")
+        for coord, standard_names in [
+                ("time", ("time",)),
+                ("pressure", ("air_pressure",))]:
+            if ((standard_name in standard_names) and
+                    not name.startswith(coord)):
+                raise ValueError("unsupported coordinate: {}".format(name))
+
+
+def _coordinate(dataset, coord, dims, coords):
+    """Axis and variable of a coordinate, found by forest.disk rules"""
+    name = disk.coord_var(coord, dims, coords)
+    if (name is None) or (name not in dataset.variables):
+        return None, None
+    var = dataset.variables[name]
+    if len(var.dimensions) == 0:
+        return None, var
+    return dims.index(var.dimensions[0]), var
+
+
+def _axis(cube, coord):
+    try:
+        dims = cube.coord_dims(coord)
+        if len(dims) == 0:
+            return None
+        else:
+            return dims[0]
+    except iris.exceptions.CoordinateNotFoundError:
+        return None
+
+
+#: Schema changes applied in order by :meth:`Database.migrate`
+MIGRATIONS = [
+    [
+        "ALTER TABLE file ADD COLUMN mtime REAL",
+        "ALTER TABLE file ADD COLUMN size INTEGER",
+    ],
+    [
+        # Covering indexes for Locator and navigation queries
+        "CREATE INDEX IF NOT EXISTS file_reference_name"
+        " ON file (reference, name)",
+        "CREATE INDEX IF NOT EXISTS variable_file_id_name"
+        " ON variable (file_id, name, time_axis, pressure_axis)",
+        "CREATE INDEX IF NOT EXISTS time_value_i ON time (value, i)",
+        "CREATE INDEX IF NOT EXISTS variable_to_time_time_id"
+        " ON variable_to_time (time_id, variable_id)",
+        "CREATE INDEX IF NOT EXISTS variable_to_pressure_pressure_id"
+        " ON variable_to_pressure (pressure_id, variable_id)",
+    ],
+    [
+        # Counter read by Locator to detect newly indexed files
+        "CREATE TABLE IF NOT EXISTS generation (value INTEGER NOT NULL)",
+        "INSERT INTO generation (value) VALUES (0)",
+    ] + [
+        """
+        CREATE TRIGGER IF NOT EXISTS {table}_{event}_generation
+         AFTER {event} ON {table}
+         BEGIN
+               UPDATE generation SET value = value + 1;
+           END
+        """.format(table=table, event=event)
+        for table in ("file", "variable")
+        for event in ("INSERT", "UPDATE", "DELETE")
+    ],
+]
+
+
 class CoordinateDB(Connection):
     def __init__(self, connection):
         self.connection = connection
@@ -221,49 +413,78 @@ class Database(Connection):
                     FOREIGN KEY(variable_id) REFERENCES variable(id),
                     FOREIGN KEY(time_id) REFERENCES time(id))
         """)
+        self.migrate()
+
+    def migrate(self):
+        """Apply schema changes made since the database was created
+
+        The number of changes already applied is stored in
+        ``PRAGMA user_version`` so each change runs exactly once
+        """
+        self.cursor.execute("PRAGMA user_version")
+        version, = self.cursor.fetchone()
+        for i, statements in enumerate(MIGRATIONS[version:], version + 1):
+            for statement in statements:
+                self.cursor.execute(statement)
+            self.cursor.execute("PRAGMA user_version = {:d}".format(i))
+        self.connection.commit()
 
     def insert_netcdf(self, path):
         """Coordinate and meta-data information taken from NetCDF file"""
-        with netCDF4.Dataset(path) as dataset:
-            try:
-                obj = dataset.variables["forecast_reference_time"]
-                reference_time = netCDF4.num2date(obj[:], units=obj.units)
-            except KeyError:
-                reference_time = None
-
-        self.insert_file_name(path, reference_time=reference_time)
-
-        cubes = iris.load(path)
-        for cube in cubes:
-            variable = cube.var_name
-            time_axis = self._axis(cube, 'time')
-            pressure_axis = self._axis(cube, 'pressure')
-            self.insert_variable(
-                path,
-                variable,
-                time_axis=time_axis,
-                pressure_axis=pressure_axis)
-            try:
-                times = [cell.point for cell in cube.coord('time').cells()]
-                self.insert_times(path, variable, times)
-            except iris.exceptions.CoordinateNotFoundError:
-                pass
-            try:
-                pressures = [cell.point for cell in cube.coord('pressure').cells()]
-                self.insert_pressures(path, variable, pressures)
-            except iris.exceptions.CoordinateNotFoundError:
-                pass
-
-    @staticmethod
-    def _axis(cube, coord):
-        try:
-            dims = cube.coord_dims(coord)
-            if len(dims) == 0:
-                return None
-            else:
-                return dims[0]
-        except iris.exceptions.CoordinateNotFoundError:
-            return None
+        self.insert_metadata(extract_metadata(path))
+
+    def insert_metadata(self, metadata):
+        """Insert rows described by :func:`extract_metadata`
+
+        Equivalent to calling :meth:`insert_variable`,
+        :meth:`insert_times` and :meth:`insert_pressures` for each
+        variable, but with one ``executemany`` per table
+        """
+        path = metadata.path
+        self.insert_file_name(path, reference_time=metadata.reference_time)
+        self.cursor.executemany("""
+            INSERT OR IGNORE
+                        INTO variable (name, time_axis, pressure_axis, file_id)
+                      VALUES (
+                             :variable,
+                             :time_axis,
+                             :pressure_axis,
+                             (SELECT id FROM file WHERE name=:path))
+        """, [dict(
+            path=path,
+            variable=v.name,
+            time_axis=v.time_axis,
+            pressure_axis=v.pressure_axis) for v in metadata.variables])
+        times = [
+            dict(path=path, variable=v.name, value=str(value), i=i)
+            for v in metadata.variables
+            for i, value in enumerate(v.times)]
+        self.cursor.executemany("""
+            INSERT OR IGNORE INTO time (i, value) VALUES (:i,:value)
+        """, times)
+        self.cursor.executemany("""
+            INSERT OR IGNORE INTO variable_to_time (variable_id, time_id)
+            VALUES(
+                (SELECT variable.id FROM variable
+                   JOIN file ON variable.file_id = file.id
+                  WHERE file.name=:path AND variable.name=:variable),
+                (SELECT id FROM time WHERE value=:value AND i=:i))
+        """, times)
+        pressures = [
+            dict(path=path, variable=v.name, pressure=value, i=i)
+            for v in metadata.variables
+            for i, value in enumerate(v.pressures)]
+        self.cursor.executemany("""
+            INSERT OR IGNORE INTO pressure (i, value) VALUES (:i,:pressure)
+        """, pressures)
+        self.cursor.executemany("""
+            INSERT OR IGNORE INTO variable_to_pressure (variable_id, pressure_id)
+            VALUES(
+                (SELECT variable.id FROM variable
+                   JOIN file ON variable.file_id = file.id
+                  WHERE file.name = :path AND variable.name=:variable),
+                (SELECT id FROM pressure WHERE value=:pressure AND i=:i))
+        """, pressures)
 
     def initial_times(self, pattern=None, variable=None):
         """Distinct initialisation times"""
@@ -323,6 +544,49 @@ class Database(Connection):
         rows = self.cursor.fetchall()
         return [r for r, in rows]
 
+    def file_stats(self):
+        """Modification time and size recorded for each file
+
+        :returns: dict of name to (mtime, size), values are None for
+                  files indexed before they were recorded
+        """
+        self.cursor.execute("SELECT name, mtime, size FROM file")
+        return {name: (mtime, size)
+                for name, mtime, size in self.cursor.fetchall()}
+
+    def insert_file_stat(self, path, mtime, size):
+        """Record modification time and size of an indexed file"""
+        self.cursor.execute("""
+            UPDATE file
+               SET mtime = :mtime, size = :size
+             WHERE name = :path
+        """, dict(path=path, mtime=mtime, size=size))
+
+    def delete_file(self, path):
+        """Remove a file and its variables from the index
+
+        Rows in ``time`` and ``pressure`` are shared between files
+        and are kept
+        """
+        row = self.cursor.execute(
+            "SELECT id FROM file WHERE name = :path",
+            dict(path=path)).fetchone()
+        if row is None:
+            return
+        file_id, = row
+        for table in ("variable_to_time", "variable_to_pressure"):
+            self.cursor.execute("""
+                DELETE FROM {}
+                 WHERE variable_id IN (
+                       SELECT id FROM variable WHERE file_id = :file_id)
+            """.format(table), dict(file_id=file_id))
+        self.cursor.execute(
+            "DELETE FROM variable WHERE file_id = :file_id",
+            dict(file_id=file_id))
+        self.cursor.execute(
+            "DELETE FROM file WHERE id = :file_id",
+            dict(file_id=file_id))
+
     def insert_file_name(self, path, reference_time=None):
         if reference_time is not None:
             reference_time = str(reference_time)
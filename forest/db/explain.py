@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Query plan audit
+----------------
+
+Run the queries issued by the navigation menus and
+:class:`forest.db.Locator` against a database and print
+``EXPLAIN QUERY PLAN`` for each one. Lines reporting a
+full table ``SCAN`` are marked so that missing indexes
+stand out as the archive grows.
+
+.. code-block:: sh
+
+   python -m forest.db.explain --database file.db
+
+Query parameters are taken from the first indexed file
+that has a variable with a time coordinate.
+
+.. autofunction:: explain
+
+"""
+import argparse
+from . import database as db
+from .locate import Locator
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="print query plans for a forest database")
+    parser.add_argument(
+        "--database", required=True,
+        help="database file to audit")
+    parser.add_argument(
+        "--pattern", default="*",
+        help="file name pattern used in queries, default '*'")
+    return parser.parse_args(args=argv)
+
+
+def main(argv=None):
+    args = parse_args(argv=argv)
+    with db.Database.connect(args.database) as database:
+        for statement, plan in explain(database, pattern=args.pattern):
+            print(statement)
+            for line in plan:
+                marker = "!" if line.startswith("SCAN") else " "
+                print("{} {}".format(marker, line))
+            print()
+
+
+def explain(database, pattern="*"):
+    """Query plans of statements issued by the application
+
+    :returns: list of (statement, plan) where plan is a list of lines
+    """
+    sample = database.connection.execute("""
+        SELECT f.name, f.reference, v.name, t.value
+          FROM file AS f
+          JOIN variable AS v
+            ON v.file_id = f.id
+          JOIN variable_to_time AS vt
+            ON vt.variable_id = v.id
+          JOIN time AS t
+            ON t.id = vt.time_id
+         LIMIT 1
+    """).fetchone()
+    if sample is None:
+        return []
+    path, initial_time, variable, valid_time = sample
+    pressures = database.pressures(variable=variable)
+    pressure = pressures[0] if len(pressures) > 0 else None
+
+    statements = []
+
+    def trace(statement):
+        if statement not in statements:
+            statements.append(statement)
+
+    database.connection.set_trace_callback(trace)
+    try:
+        database.variables(pattern)
+        database.initial_times(pattern, variable=variable)
+        database.valid_times(pattern, variable, initial_time)
+        database.pressures(pattern, variable, initial_time)
+        locator = Locator(database.connection)
+        locator.file_names(pattern, variable, initial_time, valid_time)
+        locator.axes(path, variable)
+        locator.coordinate(path, variable, "time")
+        if pressure is not None:
+            locator.coordinate(path, variable, "pressure")
+    finally:
+        database.connection.set_trace_callback(None)
+
+    result = []
+    for statement in statements:
+        rows = database.connection.execute(
+            "EXPLAIN QUERY PLAN " + statement).fetchall()
+        result.append((" ".join(statement.split()),
+                       [detail for _, _, _, detail in rows]))
+    return result
+
+
+if __name__ == '__main__':
+    main()
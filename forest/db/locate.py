@@ -1,7 +1,9 @@
 import os
-from functools import lru_cache
+import sqlite3
+import threading
 import numpy as np
 from .connection import Connection
+from forest.cache import LRUCache
 from forest.exceptions import SearchFail
 
 
@@ -10,12 +12,32 @@ __all__ = [
 ]
 
 
+#: Default number of query results held by each Locator
+CACHE_SIZE = 1024
+
+
 class Locator(Connection):
-    """Query database for path and index related to fields"""
-    def __init__(self, connection, directory=None):
+    """Query database for path and index related to fields
+
+    Query results are held in a least recently used cache of
+    ``cache_size`` entries per Locator. The cache is emptied
+    whenever the ``generation`` counter maintained by
+    :class:`forest.db.Database` shows files have been indexed
+    or removed since the results were fetched
+
+    .. note:: Queries share a cursor guarded by a lock, to use a
+              Locator from several threads the connection must be
+              made with ``check_same_thread=False``
+
+    :param cache_size: maximum number of cached query results
+    """
+    def __init__(self, connection, directory=None, cache_size=CACHE_SIZE):
         self.directory = directory
         self.connection = connection
         self.cursor = self.connection.cursor()
+        self._lock = threading.RLock()
+        self._cache = LRUCache(max_bytes=cache_size, sizeof=lambda value: 1)
+        self._generation = None
 
     def locate(
             self,
@@ -25,6 +47,7 @@ class Locator(Connection):
             valid_time,
             pressure=None,
             tolerance=0.001):
+        self.refresh()
         valid_time64 = np.datetime64(valid_time, 's')
         for file_name in self.file_names(
                 pattern,
@@ -66,9 +89,38 @@ class Locator(Connection):
                     return path, (ti, pi)
         raise SearchFail("Could not locate: {}".format(pattern))
 
-    @lru_cache()
+    def refresh(self):
+        """Empty cache if the database has changed since last call"""
+        generation = self._fetch_generation()
+        with self._lock:
+            if generation != self._generation:
+                self._cache.clear()
+                self._generation = generation
+
+    def _fetch_generation(self):
+        try:
+            rows = self._fetchall("SELECT value FROM generation", {})
+        except sqlite3.OperationalError:
+            # Database created before generation counter was added
+            return None
+        return rows[0][0] if len(rows) > 0 else None
+
+    def _cached(self, key, method, *args):
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        value = method(*args)
+        self._cache[key] = value
+        return value
+
     def file_names(self, pattern, variable, initial_time, valid_time):
-        self.cursor.execute("""
+        key = ("file_names", pattern, variable, initial_time, valid_time)
+        return self._cached(key, self._file_names,
+                            pattern, variable, initial_time, valid_time)
+
+    def _file_names(self, pattern, variable, initial_time, valid_time):
+        rows = self._fetchall("""
             SELECT DISTINCT(f.name)
               FROM file AS f
               JOIN variable AS v
@@ -87,65 +139,68 @@ class Locator(Connection):
             initial_time=initial_time,
             valid_time=valid_time,
         ))
-        return [file_name for file_name, in self.cursor.fetchall()]
+        return [file_name for file_name, in rows]
 
-    @lru_cache()
     def coordinate(self, file_name, variable, coord):
-        if coord == "pressure":
-            self.cursor.execute("""
-                SELECT p.i, p.value
-                  FROM file AS f
-                  JOIN variable AS v
-                    ON v.file_id = f.id
-                  JOIN variable_to_pressure AS vp
-                    ON vp.variable_id = v.id
-                  JOIN pressure AS p
-                    ON p.id = vp.pressure_id
-                 WHERE f.name = :file_name
-                   AND v.name = :variable
-              ORDER BY p.i
-            """, dict(
-                file_name=file_name,
-                variable=variable
-            ))
-            rows = self.cursor.fetchall()
-        elif coord == "time":
-            self.cursor.execute("""
-                SELECT t.i, t.value
-                  FROM file AS f
-                  JOIN variable AS v
-                    ON v.file_id = f.id
-                  JOIN variable_to_time AS vt
-                    ON vt.variable_id = v.id
-                  JOIN time AS t
-                    ON t.id = vt.time_id
-                 WHERE f.name = :file_name
-                   AND v.name = :variable
-              ORDER BY t.i
-            """, dict(
-                file_name=file_name,
-                variable=variable
-            ))
-            rows = self.cursor.fetchall()
-        else:
+        if coord not in ("time", "pressure"):
             raise Exception("unknown coordinate: {}".format(coord))
-        if coord == "time":
-            dtype = "datetime64[s]"
-        else:
-            dtype = "f"
-        index, values = zip(*rows)
-        array = np.empty(np.max(index) + 1, dtype=dtype)
-        for i, v in zip(index, values):
-            array[i] = v
+        key = ("coordinates", file_name, variable)
+        array = self._cached(key, self._coordinates,
+                             file_name, variable)[coord]
+        if array is None:
+            raise Exception("{} has no {} coordinate".format(variable, coord))
         return array
 
-    @lru_cache()
+    def _coordinates(self, file_name, variable):
+        """Time and pressure coordinates fetched in one query"""
+        rows = self._fetchall("""
+            SELECT 'time', t.i, t.value
+              FROM file AS f
+              JOIN variable AS v
+                ON v.file_id = f.id
+              JOIN variable_to_time AS vt
+                ON vt.variable_id = v.id
+              JOIN time AS t
+                ON t.id = vt.time_id
+             WHERE f.name = :file_name
+               AND v.name = :variable
+             UNION ALL
+            SELECT 'pressure', p.i, p.value
+              FROM file AS f
+              JOIN variable AS v
+                ON v.file_id = f.id
+              JOIN variable_to_pressure AS vp
+                ON vp.variable_id = v.id
+              JOIN pressure AS p
+                ON p.id = vp.pressure_id
+             WHERE f.name = :file_name
+               AND v.name = :variable
+        """, dict(
+            file_name=file_name,
+            variable=variable
+        ))
+        result = {}
+        for coord, dtype in [
+                ("time", "datetime64[s]"),
+                ("pressure", "f")]:
+            pairs = [(i, v) for c, i, v in rows if c == coord]
+            if len(pairs) == 0:
+                result[coord] = None
+                continue
+            index, values = zip(*pairs)
+            result[coord] = scatter(index, values, dtype)
+        return result
+
     def axes(self, file_name, variable):
         """Time/pressure axis information
 
         :returns: (time_axis, pressure_axis)
         """
-        self.cursor.execute("""
+        key = ("axes", file_name, variable)
+        return self._cached(key, self._axes, file_name, variable)
+
+    def _axes(self, file_name, variable):
+        rows = self._fetchall("""
             SELECT v.time_axis, v.pressure_axis
               FROM file AS f
               JOIN variable AS v
@@ -156,4 +211,21 @@ class Locator(Connection):
             file_name=file_name,
             variable=variable
         ))
-        return self.cursor.fetchone()
+        return rows[0] if len(rows) > 0 else None
+
+    def _fetchall(self, query, parameters):
+        with self._lock:
+            self.cursor.execute(query, parameters)
+            return self.cursor.fetchall()
+
+
+def scatter(index, values, dtype):
+    """Array with values placed at positions given by index
+
+    Values are converted in one call, e.g. time strings are parsed
+    to datetime64 together rather than one element at a time
+    """
+    index = np.asarray(index, dtype=int)
+    array = np.empty(index.max() + 1, dtype=dtype)
+    array[index] = np.array(values, dtype=dtype)
+    return array
@@ -1,5 +1,11 @@
 #!/usr/bin/env python3
 import argparse
+import fnmatch
+import glob
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from . import database as db
 
 
@@ -13,6 +19,19 @@ def add_arguments(parser):
     parser.add_argument(
         "--database", required=True,
         help="database file to write/extend")
+    parser.add_argument(
+        "--jobs", type=int, default=1, metavar="N",
+        help="extract file meta-data in N worker processes")
+    parser.add_argument(
+        "--batch-size", type=int, default=100, metavar="N",
+        help="number of files written per transaction")
+    parser.add_argument(
+        "--watch", action="store_true",
+        help=("keep running, treat FILE as glob patterns and index "
+              "new, changed and deleted files every --interval seconds"))
+    parser.add_argument(
+        "--interval", type=float, default=60, metavar="SECONDS",
+        help="time between scans in --watch mode")
     parser.add_argument(
         "paths", nargs="+", metavar="FILE",
         help="unified model netcdf files")
@@ -22,8 +41,141 @@ def main(argv=None, args=None):
     if args is None:
         args = parse_args(argv=argv)
     with db.Database.connect(args.database) as database:
-        for path in args.paths:
-            database.insert_netcdf(path)
+        if args.watch:
+            try:
+                watch(database, args.paths,
+                      interval=args.interval,
+                      jobs=args.jobs,
+                      batch_size=args.batch_size)
+            except KeyboardInterrupt:
+                pass
+        else:
+            index(database, args.paths,
+                  jobs=args.jobs,
+                  batch_size=args.batch_size)
+
+
+def watch(database, patterns, interval=60, jobs=1, batch_size=100,
+          sleep=time.sleep):
+    """Keep database in step with files matching patterns
+
+    Intended to run beside ``bokeh serve``, write-ahead logging
+    lets the server read the database while it is being updated
+    """
+    database.connection.execute("PRAGMA journal_mode=WAL")
+    while True:
+        sync(database, patterns, jobs=jobs, batch_size=batch_size)
+        sleep(interval)
+
+
+def sync(database, patterns, jobs=1, batch_size=100):
+    """Index new and changed files and remove deleted files
+
+    Files are compared using the modification time and size
+    recorded in the ``file`` table, files in the database that
+    match a pattern but no longer exist on disk are removed
+
+    :returns: (changed, deleted) lists of file names
+    """
+    stats = {path: stat(path) for path in expand(patterns)}
+    known = database.file_stats()
+    changed = sorted(path for path, value in stats.items()
+                     if known.get(path) != value)
+    deleted = sorted(name for name in known
+                     if (name not in stats) and
+                     any(fnmatch.fnmatch(name, p) for p in patterns) and
+                     not os.path.exists(name))
+    for name in deleted:
+        database.delete_file(name)
+    database.connection.commit()
+    if len(changed) > 0:
+        index(database, changed, jobs=jobs, batch_size=batch_size,
+              stats=stats)
+    if len(changed) + len(deleted) > 0:
+        print("forestdb: {} new or changed, {} deleted files".format(
+            len(changed), len(deleted)))
+    return changed, deleted
+
+
+def expand(patterns):
+    paths = set()
+    for pattern in patterns:
+        paths.update(glob.glob(pattern))
+    return sorted(paths)
+
+
+def stat(path):
+    """Modification time and size used to detect changed files"""
+    result = os.stat(path)
+    return result.st_mtime, result.st_size
+
+
+def index(database, paths, jobs=1, batch_size=100, stats=None):
+    """Insert meta-data of paths into database
+
+    Meta-data is extracted by ``jobs`` worker processes while the
+    calling process writes rows and commits every ``batch_size`` files.
+    Files already in the database are replaced
+
+    :param stats: dict of path to (mtime, size) taken before reading
+    :returns: number of files indexed
+    """
+    start = time.time()
+    if stats is None:
+        # Stat before reading so files written mid-read look changed
+        stats = {path: stat(path) for path in paths}
+    if jobs > 1:
+        chunksize = max(1, len(paths) // (4 * jobs))
+        # Forking a process that holds locks in other threads may
+        # deadlock, start clean interpreters instead
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+                max_workers=jobs, mp_context=context) as executor:
+            count = write(
+                    database,
+                    executor.map(
+                        db.extract_metadata,
+                        paths,
+                        chunksize=chunksize),
+                    batch_size,
+                    start,
+                    stats)
+    else:
+        count = write(
+                database,
+                map(db.extract_metadata, paths),
+                batch_size,
+                start,
+                stats)
+    report(count, len(paths), start)
+    return count
+
+
+def write(database, metadatas, batch_size, start, stats):
+    count = 0
+    for metadata in metadatas:
+        database.delete_file(metadata.path)
+        database.insert_metadata(metadata)
+        database.insert_file_stat(metadata.path, *stats[metadata.path])
+        count += 1
+        if (count % batch_size) == 0:
+            database.connection.commit()
+            print("forestdb: committed {} files, {:.1f} files/s".format(
+                count, rate(count, start)))
+    database.connection.commit()
+    return count
+
+
+def report(count, total, start):
+    print("forestdb: indexed {}/{} files in {:.1f}s, {:.1f} files/s".format(
+        count, total, time.time() - start, rate(count, start)))
+
+
+def rate(count, start):
+    seconds = time.time() - start
+    if seconds == 0:
+        return 0.
+    return count / seconds
 
 
 if __name__ == '__main__':
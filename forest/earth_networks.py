@@ -1,38 +1,167 @@
+"""
+Earth Networks lightning
+------------------------
+
+Flashes are read once into a :class:`Store` sorted by time with
+positions already projected to web mercator, so that each time
+step is a binary search and a slice rather than a pass over the
+whole archive.
+
+When more flashes fall inside the viewport than can be drawn as
+circles, :class:`View` sends a count of flashes per screen cell
+computed by :func:`density` instead.
+
+.. autoclass:: View
+    :members:
+
+.. autoclass:: Loader
+    :members:
+
+.. autoclass:: Store
+    :members:
+
+.. autoclass:: Archive
+    :members:
+
+.. autofunction:: density
+
+"""
 import os
 import glob
+import threading
+import time
 import datetime as dt
+import numpy as np
 import pandas as pd
 from forest import geo
+from forest.cache import LRUCache
+from forest.rdt import RenderGroup
 import bokeh.models
+import bokeh.palettes
+
+
+#: Columns read from Earth Networks CSV files
+COLUMNS = ["date", "flash_type", "latitude", "longitude"]
+
+#: Length of time window shown at each valid time
+WINDOW = dt.timedelta(minutes=15)
+
+#: Format of flash times, e.g. 20190417T000001.440
+DATE_FORMAT = "%Y%m%dT%H%M%S.%f"
+
+#: Directory, relative to CSV files, holding converted files
+DIRECTORY = ".forest-lightning"
+
+#: Maximum number of converted files held in memory by an Archive
+CACHE_SIZE = 96
+
+#: Seconds between checks for new or modified files
+INTERVAL = 60
+
+#: Flash count above which a density image replaces circles
+MAX_FLASHES = 5000
+
+#: Screen pixels along each side of a density cell
+PIXELS_PER_CELL = 4
+
+#: Cells along each side of a density image without a viewport
+DENSITY_SIZE = 256
 
 
 class View(object):
-    def __init__(self, loader):
+    """Earth Networks lightning visualisation
+
+    Flashes inside the viewport are drawn as circles unless there
+    are more than ``max_flashes`` of them, in which case a count of
+    flashes per screen cell is sent as an image instead
+
+    :param max_flashes: largest number of circles to draw
+    """
+    zoomable = True
+
+    def __init__(self, loader, max_flashes=MAX_FLASHES):
         self.loader = loader
-        self.source = bokeh.models.ColumnDataSource({
+        self.max_flashes = max_flashes
+        self.viewport = None
+        self.empty_points = {
             "x": [],
             "y": [],
             "date": [],
             "longitude": [],
             "latitude": [],
             "flash_type": []
-        })
-
-    def render(self, valid_date):
-        frame = self.loader.load_date(valid_date)
-        x, y = geo.web_mercator(
-                frame.longitude,
-                frame.latitude)
-        self.source.data = {
-            "x": x,
-            "y": y,
-            "date": frame.date,
-            "longitude": frame.longitude,
-            "latitude": frame.latitude,
-            "flash_type": frame.flash_type,
         }
+        self.empty_image = {
+            "x": [],
+            "y": [],
+            "dw": [],
+            "dh": [],
+            "image": []
+        }
+        self.empty = (self.empty_points, self.empty_image)
+        self.source = bokeh.models.ColumnDataSource(self.empty_points)
+        self.image_source = bokeh.models.ColumnDataSource(self.empty_image)
+        self.color_mapper = bokeh.models.LinearColorMapper(
+                palette=bokeh.palettes.Inferno256,
+                nan_color=bokeh.colors.RGB(0, 0, 0, a=0))
+
+    def render(self, state):
+        self.update(self.load(state))
+
+    def load(self, state):
+        """Load data needed by render, safe to call outside the document thread"""
+        if state.valid_time is None:
+            return
+        date = dt.datetime.strptime(state.valid_time, '%Y-%m-%d %H:%M:%S')
+        return self.bin(self.loader.load_window(date))
+
+    def bin(self, columns):
+        """Circles or density image of flashes inside the viewport
+
+        :returns: tuple of point and image data
+        """
+        x, y = columns["x"], columns["y"]
+        if self.viewport is None:
+            inside = np.ones(len(x), dtype=bool)
+        else:
+            inside = (
+                    (x >= self.viewport.x_start) &
+                    (x <= self.viewport.x_end) &
+                    (y >= self.viewport.y_start) &
+                    (y <= self.viewport.y_end))
+        if np.count_nonzero(inside) <= self.max_flashes:
+            points = {key: columns[key][inside] for key in self.empty_points}
+            return points, self.empty_image
+        x, y = x[inside], y[inside]
+        if self.viewport is None:
+            x_range, y_range = (x.min(), x.max()), (y.min(), y.max())
+            shape = (DENSITY_SIZE, DENSITY_SIZE)
+        else:
+            x_range = (self.viewport.x_start, self.viewport.x_end)
+            y_range = (self.viewport.y_start, self.viewport.y_end)
+            shape = (
+                    max(1, int(self.viewport.height) // PIXELS_PER_CELL),
+                    max(1, int(self.viewport.width) // PIXELS_PER_CELL))
+        return self.empty_points, density(x, y, x_range, y_range, shape)
+
+    def update(self, data):
+        """Apply loaded data to bokeh models"""
+        if data is None:
+            return
+        self.source.data, self.image_source.data = data
 
     def add_figure(self, figure):
+        image = figure.image(
+                x="x",
+                y="y",
+                dw="dw",
+                dh="dh",
+                image="image",
+                source=self.image_source,
+                color_mapper=self.color_mapper)
+        figure.add_tools(bokeh.models.HoverTool(
+                tooltips=[('Flashes', '@image')],
+                renderers=[image]))
         renderer = figure.circle(
                 x="x",
                 y="y",
@@ -49,27 +178,74 @@ class View(object):
                 },
                 renderers=[renderer])
         figure.add_tools(tool)
-        return renderer
+        return RenderGroup([image, renderer])
+
+
+def density(x, y, x_range, y_range, shape):
+    """Image of flash counts per cell
+
+    Cells without flashes are NaN so that they are transparent
+
+    :param x: web mercator x coordinates of flashes
+    :param y: web mercator y coordinates of flashes
+    :param x_range: tuple of image left and right edges
+    :param y_range: tuple of image bottom and top edges
+    :param shape: tuple of rows and columns
+    :returns: dict suitable for ColumnDataSource of image glyph
+    """
+    counts, _, _ = np.histogram2d(
+            y, x,
+            bins=shape,
+            range=[y_range, x_range])
+    counts[counts == 0] = np.nan
+    return {
+        "x": [x_range[0]],
+        "y": [y_range[0]],
+        "dw": [x_range[1] - x_range[0]],
+        "dh": [y_range[1] - y_range[0]],
+        "image": [counts]
+    }
 
 
 class Loader(object):
-    def __init__(self, paths):
+    """Earth Networks flashes in CSV files
+
+    Files are read at construction into a :class:`Store` unless
+    another store, e.g. an :class:`Archive`, is given
+
+    :param paths: CSV files
+    :param store: object with a ``window(start, end)`` method
+    """
+    def __init__(self, paths, store=None):
         self.paths = paths
-        if len(self.paths) > 0:
-            self.frame = self.read(paths)
+        if store is not None:
+            self.store = store
+        elif len(self.paths) > 0:
+            self.store = Store.from_frame(self.read(paths))
+        else:
+            self.store = Store.empty()
 
     @classmethod
     def pattern(cls, text):
-        return cls(list(sorted(glob.glob(os.path.expanduser(text)))))
+        """Loader that streams files matching text, see :class:`Archive`"""
+        archive = Archive(os.path.expanduser(text))
+        return cls(archive.paths, store=archive)
 
     def load_date(self, date):
-        frame = self.frame.set_index('date')
-        start = date
-        end = start + dt.timedelta(minutes=15)
-        s = "{:%Y-%m-%dT%H:%M}".format(start)
-        e = "{:%Y-%m-%dT%H:%M}".format(end)
-        small_frame = frame[s:e].copy()
-        return small_frame.reset_index()
+        """Flashes in the window starting at date
+
+        :returns: DataFrame with date, flash_type, latitude and
+                  longitude columns
+        """
+        columns = self.store.window(date, date + WINDOW)
+        return pd.DataFrame({name: columns[name] for name in COLUMNS})
+
+    def load_window(self, date):
+        """Flashes in the window starting at date
+
+        :returns: dict of arrays including web mercator x and y
+        """
+        return self.store.window(date, date + WINDOW)
 
     @staticmethod
     def read(csv_files):
@@ -83,6 +259,7 @@ class Loader(object):
                 converters={0: Loader.flash_type},
                 usecols=[0, 1, 2, 3],
                 names=["flash_type", "date", "latitude", "longitude"],
+                dtype={"latitude": "f8", "longitude": "f8"},
                 header=None)
             frames.append(frame)
         if len(frames) == 0:
@@ -97,3 +274,187 @@ class Loader(object):
             "1": "IC",
             "9": "Keep alive"
         }.get(value, value)
+
+
+class Store(object):
+    """Flashes sorted by time with positions projected once
+
+    :param columns: dict of equal length arrays with a datetime64
+                    ``"date"`` column, longitude and latitude are
+                    projected to ``"x"`` and ``"y"`` if not given
+    """
+    def __init__(self, columns):
+        columns = {key: np.asarray(value) for key, value in columns.items()}
+        if "x" not in columns:
+            columns["x"], columns["y"] = geo.web_mercator(
+                    columns["longitude"],
+                    columns["latitude"])
+        order = np.argsort(columns["date"], kind="stable")
+        self.columns = {key: value[order] for key, value in columns.items()}
+
+    @classmethod
+    def from_frame(cls, frame):
+        return cls({name: frame[name].to_numpy() for name in COLUMNS})
+
+    @classmethod
+    def empty(cls):
+        return cls({
+            "date": np.array([], dtype="datetime64[ns]"),
+            "flash_type": np.array([], dtype=object),
+            "latitude": np.array([], dtype="f8"),
+            "longitude": np.array([], dtype="f8")})
+
+    def __len__(self):
+        return len(self.columns["date"])
+
+    @property
+    def dates(self):
+        return self.columns["date"]
+
+    def window(self, start, end):
+        """Flashes with start <= date < end
+
+        :returns: dict of array views, no data is copied
+        """
+        bounds = np.array([start, end], dtype=self.dates.dtype)
+        i, j = np.searchsorted(self.dates, bounds, side="left")
+        return {key: value[i:j] for key, value in self.columns.items()}
+
+
+class Archive(object):
+    """Flashes read lazily from CSV files matching a pattern
+
+    Each file is converted once into a NumPy ``.npz`` file, in a
+    hidden ``.forest-lightning`` directory next to it, holding
+    typed columns sorted by time. A window only loads files whose
+    flashes overlap it. The pattern is checked for new or modified
+    files at most every ``interval`` seconds, files that have been
+    converted before are not read again.
+
+    .. note:: If the directory can not be written converted
+              files are only kept in memory
+
+    :param pattern: wildcard pattern of CSV files
+    :param cache_size: maximum number of files held in memory
+    :param interval: seconds between checks for new files
+    """
+    def __init__(self, pattern, cache_size=CACHE_SIZE, interval=INTERVAL):
+        self.pattern = pattern
+        self.interval = interval
+        self._ranges = {}
+        self._cache = LRUCache(max_bytes=cache_size, sizeof=lambda value: 1)
+        self._checked = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    @property
+    def paths(self):
+        with self._lock:
+            return sorted(self._ranges)
+
+    def refresh(self):
+        """Convert new or modified files and forget deleted files"""
+        with self._lock:
+            paths = sorted(glob.glob(self.pattern))
+            for path in set(self._ranges) - set(paths):
+                del self._ranges[path]
+            for path in paths:
+                stat = _stat(path)
+                if (path in self._ranges) and (self._ranges[path][0] == stat):
+                    continue
+                store = self._read(path, stat)
+                if len(store) == 0:
+                    self._ranges[path] = (stat, None, None)
+                else:
+                    self._ranges[path] = (stat, store.dates[0], store.dates[-1])
+            self._checked = time.monotonic()
+
+    def window(self, start, end):
+        """Flashes with start <= date < end
+
+        :returns: dict of arrays
+        """
+        if (time.monotonic() - self._checked) >= self.interval:
+            self.refresh()
+        start = np.datetime64(start, "ns")
+        end = np.datetime64(end, "ns")
+        with self._lock:
+            paths = [
+                path for path, (_, first, last) in sorted(self._ranges.items())
+                if (first is not None) and (first < end) and (last >= start)]
+        pieces = [self._load(path).window(start, end) for path in paths]
+        if len(pieces) == 0:
+            return Store.empty().window(start, end)
+        if len(pieces) == 1:
+            return pieces[0]
+        return Store({
+            key: np.concatenate([piece[key] for piece in pieces])
+            for key in pieces[0]}).columns
+
+    def _load(self, path):
+        with self._lock:
+            stat = self._ranges[path][0]
+        store = self._cache.get((path, stat))
+        if store is None:
+            store = self._read(path, stat)
+        return store
+
+    def _read(self, path, stat):
+        """Converted file if up to date, otherwise read and convert CSV"""
+        cache = cache_path(path)
+        store = None
+        try:
+            with np.load(cache) as npz:
+                if tuple(npz["stat"]) == stat:
+                    store = Store({key: npz[key] for key in npz.files
+                                   if key != "stat"})
+        except (OSError, KeyError, ValueError):
+            pass
+        if store is None:
+            store = Store.from_frame(read_csv(path))
+            try:
+                os.makedirs(os.path.dirname(cache), exist_ok=True)
+                tmp = cache + ".tmp.npz"
+                np.savez(tmp, stat=np.array(stat), **{
+                    key: value.astype(str) if key == "flash_type" else value
+                    for key, value in store.columns.items()})
+                os.replace(tmp, cache)
+            except OSError:
+                pass
+        self._cache[(path, stat)] = store
+        return store
+
+
+def cache_path(path):
+    """Location of converted copy of a CSV file"""
+    directory = os.path.join(os.path.dirname(path), DIRECTORY)
+    return os.path.join(directory, os.path.basename(path) + ".npz")
+
+
+def read_csv(path):
+    """Read an Earth Networks CSV file with typed columns
+
+    :returns: DataFrame with date, flash_type, latitude and
+              longitude columns
+    """
+    frame = pd.read_csv(
+        path,
+        usecols=[0, 1, 2, 3],
+        names=["flash_type", "date", "latitude", "longitude"],
+        dtype={
+            "flash_type": str,
+            "date": str,
+            "latitude": "f8",
+            "longitude": "f8"},
+        header=None)
+    frame["flash_type"] = frame["flash_type"].map(Loader.flash_type)
+    try:
+        frame["date"] = pd.to_datetime(frame["date"], format=DATE_FORMAT)
+    except ValueError:
+        frame["date"] = pd.to_datetime(frame["date"])
+    return frame
+
+
+def _stat(path):
+    result = os.stat(path)
+    return (result.st_mtime, result.st_size)
@@ -3,41 +3,119 @@ try:
 except ImportError:
     # ReadTheDocs unable to pip install cartopy
     pass
+from functools import lru_cache
 import numpy as np
 import scipy.interpolate
 import scipy.ndimage
 
 
 def stretch_image(lons, lats, values):
-    if np.ma.is_masked(values):
-        mask = values.mask
-    else:
-        mask = None
-
-    gx, _ = web_mercator(
-        lons,
-        np.zeros(len(lons), dtype="d"))
-    _, gy = web_mercator(
-        np.zeros(len(lats), dtype="d"),
-        lats)
-    image = stretch_y(gy)(values)
-    if mask is not None:
-        image_mask = stretch_y(gy)(mask)
-        image = np.ma.masked_invalid(np.ma.masked_array(image, mask=image_mask))
-
-    x = gx.min()
-    y = gy.min()
-    dw = gx[-1] - gx[0]
-    dh = gy[-1] - gy[0]
+    grid = mercator_grid(lons, lats)
+    image = grid.stretch(values)
     return {
-        "x": [x],
-        "y": [y],
-        "dw": [dw],
-        "dh": [dh],
+        "x": [grid.x],
+        "y": [grid.y],
+        "dw": [grid.dw],
+        "dh": [grid.dh],
         "image": [image]
     }
 
 
+def mercator_grid(lons, lats):
+    """Web mercator extent and row resampler of a longitude/latitude grid
+
+    Projection and resampling weights only depend on the grid, they
+    are computed once per grid and re-used by subsequent images
+
+    :returns: :class:`MercatorGrid`
+    """
+    return _mercator_grid(_key(lons), _key(lats))
+
+
+def _key(values):
+    return np.ascontiguousarray(np.ma.getdata(values), dtype="d").tobytes()
+
+
+@lru_cache(maxsize=64)
+def _mercator_grid(lons_key, lats_key):
+    lons = np.frombuffer(lons_key, dtype="d")
+    lats = np.frombuffer(lats_key, dtype="d")
+    return MercatorGrid(lons, lats)
+
+
+class MercatorGrid(object):
+    """Web mercator extent and row resampler of a longitude/latitude grid
+
+    :param lons: 1D array of longitudes
+    :param lats: 1D array of latitudes
+    """
+    def __init__(self, lons, lats):
+        gx, _ = web_mercator(
+            lons,
+            np.zeros(len(lons), dtype="d"))
+        _, gy = web_mercator(
+            np.zeros(len(lats), dtype="d"),
+            lats)
+        self.x = gx.min()
+        self.y = gy.min()
+        self.dw = gx[-1] - gx[0]
+        self.dh = gy[-1] - gy[0]
+        self.stretch = StretchY(gy)
+
+
+class StretchY(object):
+    """Vectorised equivalent of :func:`stretch_y`
+
+    Each row of the evenly spaced output is a linear blend of two
+    source rows. The row indices and weights are computed once,
+    resampling an image is then a gather of two sets of rows and
+    a multiply-add applied to the whole array.
+
+    Masked values are not blended, an output pixel is masked
+    if either source pixel it depends on is masked
+
+    :param uneven_y: 1D array of projected row coordinates
+    """
+    def __init__(self, uneven_y):
+        uneven_y = np.asarray(uneven_y, dtype="d")
+        n = len(uneven_y)
+        even_y = np.linspace(uneven_y.min(), uneven_y.max(), n)
+        # np.interp needs ascending coordinates, e.g. north to south
+        # grids are interpolated in sorted order and mapped back
+        order = np.argsort(uneven_y, kind="stable")
+        if n > 1:
+            fractions = np.interp(
+                    even_y, uneven_y[order], np.arange(n, dtype="d"))
+        else:
+            fractions = np.zeros(n, dtype="d")
+        j0 = np.clip(np.floor(fractions).astype("i"), 0, n - 1)
+        self.weights = fractions - j0
+        j1 = np.where(self.weights > 0, np.minimum(j0 + 1, n - 1), j0)
+        self.i0 = order[j0]
+        self.i1 = order[j1]
+
+    def __call__(self, values):
+        if np.ma.is_masked(values):
+            image = self.blend(np.ma.getdata(values))
+            mask = np.ma.getmaskarray(values)
+            image_mask = mask[self.i0] | mask[self.i1]
+            return np.ma.masked_invalid(
+                    np.ma.masked_array(image, mask=image_mask))
+        return self.blend(np.ma.getdata(values))
+
+    def blend(self, values):
+        values = np.asarray(values)
+        assert values.ndim == 2, "Can only stretch 2D arrays"
+        msg = "{} != {} do not match".format(values.shape[0], len(self.i0))
+        assert values.shape[0] == len(self.i0), msg
+        if not np.issubdtype(values.dtype, np.floating):
+            values = values.astype("d")
+        weights = self.weights.astype(values.dtype)
+        lower = values[self.i0]
+        upper = values[self.i1]
+        return lower + weights[:, np.newaxis] * (upper - lower)
+
+
 def stretch_y(uneven_y):
     """Mercator projection stretches longitude spacing
 
@@ -48,25 +126,25 @@ def stretch_y(uneven_y):
               in longitude/latitude space prior to projection
     """
     if isinstance(uneven_y, list):
-        uneven_y = np.asarray(uneven_y, dtype=np.float)
+        uneven_y = np.asarray(uneven_y, dtype=float)
     even_y = np.linspace(
         uneven_y.min(), uneven_y.max(), len(uneven_y),
-        dtype=np.float)
-    index = np.arange(len(uneven_y), dtype=np.float)
+        dtype=float)
+    index = np.arange(len(uneven_y), dtype=float)
     index_function = scipy.interpolate.interp1d(uneven_y, index)
     index_fractions = index_function(even_y)
 
     def wrapped(values, axis=0):
         if isinstance(values, list):
-            values = np.asarray(values, dtype=np.float)
+            values = np.asarray(values, dtype=float)
         assert values.ndim == 2, "Can only stretch 2D arrays"
         msg = "{} != {} do not match".format(values.shape[axis], len(uneven_y))
         assert values.shape[axis] == len(uneven_y), msg
         if axis == 0:
             i = index_fractions
-            j = np.arange(values.shape[1], dtype=np.float)
+            j = np.arange(values.shape[1], dtype=float)
         elif axis == 1:
-            i = np.arange(values.shape[0], dtype=np.float)
+            i = np.arange(values.shape[0], dtype=float)
             j = index_fractions
         else:
             raise Exception("Can only handle axis 0 or 1")
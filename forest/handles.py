@@ -0,0 +1,82 @@
+"""
+Open dataset pool
+-----------------
+
+Daily files, e.g. EIDA50 imagery, hold one frame every fifteen
+minutes. Opening and closing the same file for each frame costs
+more than decoding the frame itself. A pool keeps a bounded number
+of :class:`netCDF4.Dataset` handles open, closing the least recently
+used handle when a new file is opened.
+
+>>> with POOL.dataset(path) as dataset:
+...     values = dataset.variables["data"][itime]
+
+.. note:: netCDF-C is not thread-safe, handles are only used while
+          holding :data:`forest.util.NETCDF_LOCK`
+
+.. autoclass:: DatasetPool
+    :members:
+
+"""
+import os
+from collections import OrderedDict
+from contextlib import contextmanager
+import netCDF4
+from forest.util import NETCDF_LOCK
+
+
+#: Maximum number of handles held open by the shared pool
+MAX_SIZE = 8
+
+
+class DatasetPool(object):
+    """Bounded pool of open netCDF4.Dataset handles keyed by path
+
+    A handle is re-opened if the modification time or size of
+    its file has changed since it was opened
+
+    :param max_size: maximum number of open handles
+    """
+    def __init__(self, max_size=MAX_SIZE):
+        self.max_size = max_size
+        self.opened = 0
+        self._handles = OrderedDict()
+
+    def __len__(self):
+        return len(self._handles)
+
+    @contextmanager
+    def dataset(self, path):
+        """Open dataset, NETCDF_LOCK is held until the block exits"""
+        with NETCDF_LOCK:
+            yield self._get(path)
+
+    def _get(self, path):
+        stat = os.stat(path)
+        stat = (stat.st_mtime, stat.st_size)
+        if path in self._handles:
+            opened, dataset = self._handles[path]
+            if opened == stat:
+                self._handles.move_to_end(path)
+                return dataset
+            self._close(path)
+        dataset = netCDF4.Dataset(path)
+        self.opened += 1
+        self._handles[path] = (stat, dataset)
+        while len(self._handles) > self.max_size:
+            self._close(next(iter(self._handles)))
+        return dataset
+
+    def _close(self, path):
+        _, dataset = self._handles.pop(path)
+        dataset.close()
+
+    def close(self):
+        """Close all open handles"""
+        with NETCDF_LOCK:
+            while len(self._handles) > 0:
+                self._close(next(iter(self._handles)))
+
+
+#: Pool shared by loaders in a server process
+POOL = DatasetPool()
@@ -23,11 +23,15 @@ from forest import (
         unified_model,
         intake_loader,
         navigate,
-        parse_args)
+        parse_args,
+        prefetch,
+        pyramid,
+        quantise)
 import forest.config as cfg
 from forest.observe import Observable
 from forest.db.util import autolabel
 import datetime as dt
+from functools import partial
 
 
 def main(argv=None):
@@ -41,11 +45,31 @@ def main(argv=None):
                     os.environ,
                     args.variables))
 
+    if args.image_cache_mb is not None:
+        data.set_image_cache_size(args.image_cache_mb)
+    elif config.image_cache_mb is not None:
+        data.set_image_cache_size(config.image_cache_mb)
+
     database = None
+    loader_database = None
     if args.database is not None:
         if args.database != ':memory:':
             assert os.path.exists(args.database), "{} must exist".format(args.database)
-        database = db.Database.connect(args.database)
+        if args.render_workers == 0:
+            database = db.Database.connect(args.database)
+            loader_database = database
+        elif args.database == ':memory:':
+            # In-memory databases can not be opened twice
+            database = db.Database.connect(
+                    args.database, check_same_thread=False)
+            loader_database = database
+        else:
+            # Render threads query db.Locator, which serialises access
+            # with a lock, through a separate connection. The navigator
+            # keeps a connection used only on the document thread
+            database = db.Database.connect(args.database)
+            loader_database = db.Database.connect(
+                    args.database, check_same_thread=False)
 
     # Full screen map
     lon_range = (90, 140)
@@ -124,12 +148,17 @@ def main(argv=None):
         if group.label not in data.LOADERS:
             if group.locator == "database":
                 loader = load.Loader.group_args(
-                        group, args, database=database)
+                        group, args, database=loader_database)
             else:
                 loader = load.Loader.group_args(
                         group, args)
             data.add_loader(group.label, loader)
 
+    if args.quantise is not None:
+        quantiser = quantise.Quantiser(color_mapper, bits=args.quantise)
+    else:
+        quantiser = None
+
     renderers = {}
     viewers = {}
     for name, loader in data.LOADERS.items():
@@ -138,25 +167,41 @@ def main(argv=None):
         elif isinstance(loader, earth_networks.Loader):
             viewer = earth_networks.View(loader)
         elif isinstance(loader, data.GPM):
-            viewer = view.GPMView(loader, color_mapper)
+            viewer = view.GPMView(loader, color_mapper, quantiser)
         elif isinstance(loader, satellite.EIDA50):
-            viewer = view.EIDA50(loader, color_mapper)
+            viewer = view.EIDA50(loader, color_mapper, quantiser)
         elif isinstance(loader, intake_loader.IntakeLoader):
-            viewer = view.UMView(loader, color_mapper)
+            viewer = view.UMView(loader, color_mapper, quantiser)
             viewer.set_hover_properties(intake_loader.INTAKE_TOOLTIPS,
                                         intake_loader.INTAKE_FORMATTERS)
         else:
-            viewer = view.UMView(loader, color_mapper)
+            viewer = view.UMView(loader, color_mapper, quantiser)
         viewers[name] = viewer
         renderers[name] = [
                 viewer.add_figure(f)
                 for f in figures]
 
-    artist = Artist(viewers, renderers)
+    if args.render_workers > 0:
+        artist = Artist(
+                viewers,
+                renderers,
+                executor=data.shared_executor(
+                    "render", args.render_workers),
+                document=bokeh.plotting.curdoc())
+    else:
+        artist = Artist(viewers, renderers)
     renderers = []
     for _, r in artist.renderers.items():
         renderers += r
 
+    # Select image resolution once interactive pan/zoom ends
+    def on_lod_end(event):
+        artist.on_viewport(viewport(figures))
+    artist.on_viewport(viewport(figures))
+    for f in figures:
+        f.on_event(bokeh.events.LODEnd, on_lod_end)
+        f.on_event(bokeh.events.Reset, on_lod_end)
+
     image_sources = []
     for name, viewer in artist.viewers.items():
         if isinstance(viewer, (view.UMView, view.GPMView, view.EIDA50)):
@@ -243,6 +288,16 @@ def main(argv=None):
 
     image_controls.subscribe(artist.on_visible)
 
+    # Warm image cache with neighbouring fields
+    prefetchers = []
+    if args.prefetch > 0:
+        prefetcher = prefetch.Prefetch(
+                data.LOADERS,
+                steps=args.prefetch,
+                executor=data.shared_executor("prefetch", 2))
+        image_controls.subscribe(prefetcher.on_visible)
+        prefetchers.append(prefetcher)
+
     div = bokeh.models.Div(text="", width=10)
     border_row = bokeh.layouts.row(
         bokeh.layouts.column(toggle),
@@ -254,7 +309,10 @@ def main(argv=None):
         image_controls.select(name)
         break
 
-    navigator = navigate.Navigator(config, database)
+    navigator = navigate.Navigator(
+            config,
+            database,
+            coordinate_cache=args.coordinate_cache)
 
     # Pre-select menu choices (if any)
     initial_state = {}
@@ -267,6 +325,7 @@ def main(argv=None):
         keys.navigate,
         db.InverseCoordinate("pressure"),
         db.next_previous,
+        *prefetchers,
         db.Controls(navigator),
         db.Converter({
             "valid_times": db.stamps,
@@ -365,7 +424,10 @@ def main(argv=None):
     series_view = series.SeriesView.from_groups(
             series_figure,
             config.file_groups,
-            directory=args.directory)
+            directory=args.directory,
+            executor=data.shared_executor(
+                "series", max(1, len(config.file_groups))),
+            document=bokeh.plotting.curdoc())
     series_view.subscribe(store.dispatch)
     series_args = (rx.Stream()
                 .listen_to(store)
@@ -373,7 +435,6 @@ def main(argv=None):
                 .filter(lambda x: x is not None)
                 .distinct())
     series_args.map(lambda a: series_view.render(*a))
-    series_args.map(print)  # Note: map(print) creates None stream
     for f in figures:
         f.on_event(bokeh.events.Tap, series_view.on_tap)
         f.on_event(bokeh.events.Tap, place_marker(f, marker_source))
@@ -432,10 +493,45 @@ def any_none(obj, attrs):
     return any([getattr(obj, x) is None for x in attrs])
 
 
+def viewport(figures):
+    """Visible extent of figures sharing x and y ranges
+
+    Screen size is taken from the largest figure, ``inner_width``
+    and ``inner_height`` are used once reported by the browser
+
+    :returns: :class:`forest.pyramid.Viewport`
+    """
+    width = max((f.inner_width or f.plot_width) for f in figures)
+    height = max((f.inner_height or f.plot_height) for f in figures)
+    figure = figures[0]
+    return pyramid.Viewport(
+            figure.x_range.start,
+            figure.x_range.end,
+            figure.y_range.start,
+            figure.y_range.end,
+            width,
+            height)
+
+
 class Artist(object):
-    def __init__(self, viewers, renderers):
+    """Render visible layers when application state changes
+
+    Given an executor and a document, viewers that implement
+    ``load(state)`` and ``update(data)`` are rendered asynchronously.
+    Data is loaded by the executor and applied to the document on
+    the next tick. Results of superseded loads are discarded.
+
+    :param viewers: dict of viewers keyed by label
+    :param renderers: dict of renderers keyed by label
+    :param executor: optional :class:`concurrent.futures.Executor`
+    :param document: bokeh document needed by asynchronous renders
+    """
+    def __init__(self, viewers, renderers, executor=None, document=None):
         self.viewers = viewers
         self.renderers = renderers
+        self.executor = executor
+        self.document = document
+        self.futures = {}
         self.visible_state = None
         self.state = None
 
@@ -472,14 +568,72 @@ class Artist(object):
         self.state = state
         self.render()
 
-    def render(self):
+    def on_viewport(self, viewport):
+        """Re-render layers whose detail depends on the visible extent
+
+        :param viewport: :class:`forest.pyramid.Viewport`
+        """
+        names = []
+        for name, viewer in self.viewers.items():
+            if getattr(viewer, "zoomable", False):
+                viewer.viewport = viewport
+                names.append(name)
+        self.render(names)
+
+    def render(self, names=None):
         if self.visible_state is None:
             return
         if self.state is None:
             return
         for name in self.visible_state:
+            if (names is not None) and (name not in names):
+                continue
             viewer = self.viewers[name]
-            viewer.render(self.state)
+            if self.asynchronous(viewer):
+                self.submit(name, viewer, self.state)
+            else:
+                viewer.render(self.state)
+
+    def asynchronous(self, viewer):
+        return (
+                (self.executor is not None) and
+                (self.document is not None) and
+                hasattr(viewer, "load") and
+                hasattr(viewer, "update"))
+
+    def submit(self, name, viewer, state):
+        """Load data in executor, cancelling superseded loads"""
+        previous = self.futures.get(name)
+        if previous is not None:
+            previous.cancel()
+        future = self.executor.submit(viewer.load, state)
+        self.futures[name] = future
+        future.add_done_callback(partial(self.on_load, name, viewer))
+
+    def on_load(self, name, viewer, future):
+        """Schedule document update, called from executor thread"""
+        if future.cancelled() or (self.futures.get(name) is not future):
+            return
+        self.document.add_next_tick_callback(
+                partial(self.on_tick, name, viewer, future))
+
+    def on_tick(self, name, viewer, future):
+        """Apply loaded data unless a newer load has been submitted
+
+        A failed load clears the layer, if the viewer has an ``empty``
+        attribute, and re-raises the error so that it reaches the
+        server log instead of leaving stale data on screen
+        """
+        if self.futures.get(name) is not future:
+            return
+        del self.futures[name]
+        exception = future.exception()
+        if exception is not None:
+            print("Artist: {} failed to load: {}".format(name, exception))
+            if hasattr(viewer, "empty"):
+                viewer.update(viewer.empty)
+            raise exception
+        viewer.update(future.result())
 
 
 class TimeControls(Observable):
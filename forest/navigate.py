@@ -14,11 +14,18 @@ from forest import (
         rdt,
         intake_loader,
         saf,
+        sidecar,
 )
 
 
 class Navigator:
-    def __init__(self, config, database):
+    """Menu choices for each file group
+
+    :param coordinate_cache: optional SQLite file used by
+                             :class:`forest.sidecar.CoordinateCache`
+                             to remember file system navigation
+    """
+    def __init__(self, config, database, coordinate_cache=None):
         # TODO: Once the idea of a "Group" exists we can avoid using the
         # config and defer the sub-navigator creation to each of the
         # groups. This will remove the need for the `_from_group` helper
@@ -30,6 +37,11 @@ class Navigator:
         # self._navigators = {group.label: group.navigator for group in ...}
         self._navigators = {group.pattern: self._from_group(group, database)
                            for group in config.file_groups}
+        if coordinate_cache is not None:
+            for navigator in self._navigators.values():
+                if isinstance(navigator, FileSystemNavigator):
+                    navigator.coordinates = sidecar.CoordinateCache(
+                        navigator.coordinates, coordinate_cache)
 
     @classmethod
     def _from_group(cls, group, database):
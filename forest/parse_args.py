@@ -20,6 +20,9 @@ def add_arguments(parser):
     parser.add_argument(
         "--database",
         help="SQL database to optimise menu system")
+    parser.add_argument(
+        "--coordinate-cache", metavar="FILE",
+        help="SQLite file to remember menu choices of files not in --database")
     parser.add_argument(
         "--config-file",
         metavar="YAML_FILE",
@@ -34,3 +37,15 @@ def add_arguments(parser):
         "--var", action="append", dest="variables",
         nargs=2, metavar=("KEY", "VALUE"),
         help="variable(s) to substitute in --config-file, may be repeated")
+    parser.add_argument(
+        "--image-cache-mb", type=float, metavar="MB",
+        help="memory limit of shared image cache, default 1024, overrides --config-file setting")
+    parser.add_argument(
+        "--prefetch", type=int, default=0, metavar="N",
+        help="load N valid times either side of the current time in the background")
+    parser.add_argument(
+        "--render-workers", type=int, default=0, metavar="N",
+        help="load images in N threads to keep the page responsive")
+    parser.add_argument(
+        "--quantise", type=int, choices=[8, 16], metavar="BITS",
+        help="send images to the browser as 8 or 16 bit integers")
@@ -0,0 +1,177 @@
+"""
+Prefetch images
+---------------
+
+Stepping through valid times or pressure levels triggers a
+cold read of each field. To make navigation feel instant the
+:class:`Prefetch` middleware warms the shared image cache
+with neighbouring fields in a pool of worker threads while the
+user inspects the current field.
+
+>>> prefetch = Prefetch(data.LOADERS, steps=2)
+>>> image_controls.subscribe(prefetch.on_visible)
+>>> middlewares = [
+...     db.next_previous,
+...     prefetch,
+...     db.Controls(navigator)]
+
+.. autoclass:: Prefetch
+    :members:
+
+.. autofunction:: neighbours
+
+"""
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from forest import data, db
+from forest.db.control import SET_VALUE
+from forest.redux import middleware
+
+
+#: State keys that trigger a prefetch when set
+KEYS = (
+    "pattern",
+    "variable",
+    "initial_time",
+    "valid_time",
+    "pressure")
+
+
+def neighbours(items, item, steps):
+    """Items either side of item, nearest first
+
+    >>> neighbours([1, 2, 3, 4, 5], 3, 2)
+    [4, 2, 5, 1]
+
+    :param items: sortable collection
+    :param item: value in items
+    :param steps: number of items to select in each direction
+    :returns: list of neighbouring items, empty if item not found
+    """
+    items = list(sorted(items))
+    try:
+        i = items.index(item)
+    except ValueError:
+        return []
+    result = []
+    for step in range(1, steps + 1):
+        if (i + step) < len(items):
+            result.append(items[i + step])
+        if (i - step) >= 0:
+            result.append(items[i - step])
+    return result
+
+
+def nearest_neighbours(values, value, steps, tolerance=0.01):
+    """Version of :func:`neighbours` for floating point values"""
+    if (value is None) or (len(values) == 0):
+        return []
+    values = list(sorted(values))
+    i = np.argmin(np.abs(np.asarray(values) - value))
+    if abs(values[i] - value) > tolerance:
+        return []
+    return neighbours(values, values[i], steps)
+
+
+class Prefetch(object):
+    """Warm image cache with neighbouring valid times and pressures
+
+    After each SET_VALUE action, fields for the next and previous
+    ``steps`` valid times and the adjacent pressure levels are
+    located on the calling thread and loaded into
+    :data:`forest.data.IMAGES` by a pool of worker threads.
+    Queued loads that are no longer neighbours of the current
+    state are cancelled.
+
+    .. note:: Only loaders that share :data:`forest.data.IMAGES`,
+              i.e. :class:`forest.data.DBLoader`, are prefetched
+
+    :param loaders: dict of loaders keyed by label
+    :param steps: number of valid times to prefetch either side
+    :param max_workers: size of worker pool
+    :param executor: optional :class:`concurrent.futures.Executor`
+    """
+    def __init__(self, loaders, steps=1, max_workers=2, executor=None):
+        self.loaders = loaders
+        self.steps = steps
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.executor = executor
+        self.pending = {}
+        self.visible = None
+
+    def on_visible(self, visible_state):
+        """Restrict prefetch to layers shown on a figure
+
+        :param visible_state: dict emitted by :class:`forest.images.Controls`
+        """
+        self.visible = set(
+                name for name, flags in visible_state.items()
+                if any(flags))
+
+    @middleware
+    def __call__(self, store, next_dispatch, action):
+        next_dispatch(action)
+        if action["kind"] != SET_VALUE:
+            return
+        if action["payload"]["key"] not in KEYS:
+            return
+        self.prefetch(store.state)
+
+    def prefetch(self, state):
+        """Submit loads for fields neighbouring state"""
+        keys = []
+        for neighbour in self.states(state):
+            for name, loader in self.loaders.items():
+                if not isinstance(loader, data.DBLoader):
+                    continue
+                if (self.visible is not None) and (name not in self.visible):
+                    continue
+                found = loader.locate(neighbour)
+                if found is None:
+                    continue
+                path, pts = found
+                keys.append(self.submit(path, neighbour.variable, pts))
+        self.cancel(set(keys))
+
+    def submit(self, path, variable, pts):
+        key = data.image_key(path, variable, pts, pts)
+        if (key in data.IMAGES) or (key in self.pending):
+            return key
+        if key in data.PENDING:
+            # Loading elsewhere, e.g. by a render worker
+            return key
+        future = self.executor.submit(
+                data.load_pyramid, path, variable, pts, pts)
+        self.pending[key] = future
+        future.add_done_callback(lambda f: self.pending.pop(key, None))
+        return key
+
+    def cancel(self, keys):
+        """Cancel queued loads not in keys"""
+        for key, future in list(self.pending.items()):
+            if key not in keys:
+                future.cancel()
+
+    def states(self, state):
+        """States representing neighbouring fields
+
+        :param state: dict representing application state
+        :returns: list of :class:`forest.db.State`
+        """
+        kwargs = {k: state.get(k, None) for k in db.State._fields}
+        current = db.State(**kwargs)
+        states = []
+        if current.valid_times is not None:
+            for valid_time in neighbours(
+                    current.valid_times,
+                    current.valid_time,
+                    self.steps):
+                states.append(current._replace(valid_time=valid_time))
+        if current.pressures is not None:
+            for pressure in nearest_neighbours(
+                    current.pressures,
+                    current.pressure,
+                    1):
+                states.append(current._replace(pressure=pressure))
+        return states
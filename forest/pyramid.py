@@ -0,0 +1,159 @@
+"""
+Image pyramids
+--------------
+
+Fields are stored at full resolution as a stack of images, each
+level half the size of the previous one. When the map is zoomed
+out a coarse level is sent to the browser, when zoomed in a
+finer level cropped to the visible extent is sent instead. The
+number of pixels transferred is roughly proportional to the
+number of pixels on screen rather than the size of the field.
+
+>>> pyramid = Pyramid(geo.stretch_image(lons, lats, values))
+>>> viewport = Viewport(x_start, x_end, y_start, y_end, 800, 600)
+>>> pyramid.image(viewport)
+
+.. autoclass:: Pyramid
+    :members:
+
+.. autoclass:: Viewport
+
+.. autofunction:: block_mean
+
+"""
+from collections import namedtuple
+import numpy as np
+from forest.cache import nbytes
+
+
+#: Levels are not reduced below this number of pixels along an axis
+MIN_SIZE = 128
+
+#: Fields larger than this are served at quarter resolution when
+#: no viewport is available, matching images sent before pyramids
+BASELINE_SIZE = 200 * 200  # Chosen since TMA WRF is 199 x 199
+BASELINE_LEVEL = 2
+
+#: Relative tolerance when comparing data and screen pixels
+TOLERANCE = 1e-6
+
+
+Viewport = namedtuple("Viewport", (
+    "x_start",
+    "x_end",
+    "y_start",
+    "y_end",
+    "width",
+    "height"))
+Viewport.__doc__ = """Visible extent in web mercator and size in pixels"""
+
+
+def block_mean(values):
+    """Average non-overlapping 2x2 blocks of pixels
+
+    Odd trailing rows and columns are dropped, masked pixels are
+    ignored and a block is only masked if all of its pixels are
+    masked
+
+    :param values: 2D array
+    :returns: masked array half the size of values
+    """
+    ny, nx = values.shape
+    ny, nx = 2 * (ny // 2), 2 * (nx // 2)
+    values = np.ma.masked_invalid(values[:ny, :nx])
+    blocks = values.reshape(ny // 2, 2, nx // 2, 2)
+    return blocks.mean(axis=(1, 3))
+
+
+class Pyramid(object):
+    """Multi-resolution representation of a stretched image
+
+    :param image: dict returned by :func:`forest.geo.stretch_image`
+    :param min_size: smallest number of pixels along an axis
+    """
+    def __init__(self, image, min_size=MIN_SIZE):
+        x, y = image["x"][0], image["y"][0]
+        dw, dh = image["dw"][0], image["dh"][0]
+        values = image["image"][0]
+        if values.dtype == np.float64:
+            # Single precision is plenty for display and halves memory
+            values = values.astype(np.float32)
+        self.levels = [(x, y, dw, dh, values)]
+        while (min(values.shape) // 2) >= min_size:
+            ny, nx = values.shape
+            reduced = block_mean(values)
+            dw = dw * (2 * reduced.shape[1]) / nx
+            dh = dh * (2 * reduced.shape[0]) / ny
+            values = reduced
+            self.levels.append((x, y, dw, dh, values))
+
+    @property
+    def nbytes(self):
+        """Memory held by all levels"""
+        return nbytes([level[-1] for level in self.levels])
+
+    def image(self, viewport=None):
+        """Image suitable for a viewport
+
+        :param viewport: :class:`Viewport` or None for the full extent
+                         at :meth:`baseline` resolution
+        :returns: dict with x, y, dw, dh and image keys
+        """
+        if viewport is None:
+            x, y, dw, dh, _ = self.levels[0]
+            viewport = Viewport(x, x + dw, y, y + dh, None, None)
+            return self.crop(self.baseline(), viewport, margin=0)
+        return self.crop(self.select(viewport), viewport)
+
+    def baseline(self):
+        """Index of level used when the screen size is unknown"""
+        if self.levels[0][-1].size > BASELINE_SIZE:
+            return min(BASELINE_LEVEL, len(self.levels) - 1)
+        return 0
+
+    def select(self, viewport):
+        """Index of coarsest level with at least one pixel per screen pixel"""
+        width = abs(viewport.x_end - viewport.x_start)
+        height = abs(viewport.y_end - viewport.y_start)
+        for i in reversed(range(len(self.levels))):
+            _, _, dw, dh, values = self.levels[i]
+            ny, nx = values.shape
+            if ((nx * width / dw) >= (viewport.width * (1 - TOLERANCE)) and
+                    (ny * height / dh) >= (viewport.height * (1 - TOLERANCE))):
+                return i
+        return 0
+
+    def crop(self, i, viewport, margin=0.5):
+        """Part of a level covering viewport
+
+        A margin, expressed as a fraction of the viewport, is kept on
+        each side so that small pans do not reveal missing data
+
+        :returns: dict with x, y, dw, dh and image keys
+        """
+        x, y, dw, dh, values = self.levels[i]
+        ny, nx = values.shape
+        x_start, x_end = sorted((viewport.x_start, viewport.x_end))
+        y_start, y_end = sorted((viewport.y_start, viewport.y_end))
+        x_pad = margin * (x_end - x_start)
+        y_pad = margin * (y_end - y_start)
+        i0, i1 = self._indices(x_start - x_pad, x_end + x_pad, x, dw, nx)
+        j0, j1 = self._indices(y_start - y_pad, y_end + y_pad, y, dh, ny)
+        if (i1 <= i0) or (j1 <= j0):
+            # Viewport outside image, send the smallest level
+            x, y, dw, dh, values = self.levels[-1]
+            ny, nx = values.shape
+            i0, i1, j0, j1 = 0, nx, 0, ny
+        return {
+            "x": [x + i0 * dw / nx],
+            "y": [y + j0 * dh / ny],
+            "dw": [(i1 - i0) * dw / nx],
+            "dh": [(j1 - j0) * dh / ny],
+            "image": [values[j0:j1, i0:i1]]
+        }
+
+    @staticmethod
+    def _indices(start, end, origin, length, n):
+        i0 = int(np.floor((start - origin) * n / length))
+        i1 = int(np.ceil((end - origin) * n / length))
+        return max(i0, 0), min(i1, n)
@@ -0,0 +1,148 @@
+"""
+Quantised images
+----------------
+
+Images are sent to the browser as float64 arrays by default. On
+slow connections it is quicker to send 8 or 16 bit integer codes
+quantised against the low and high values of the colour mapper.
+Offset and scale are sent alongside each image so that hover
+tools can still display the original values.
+
+>>> quantiser = Quantiser(color_mapper, bits=8)
+>>> viewer = view.UMView(loader, color_mapper, quantiser=quantiser)
+
+Codes are laid out so that a second :class:`bokeh.models.LinearColorMapper`
+reproduces the colours of the original mapper
+
+====================  ==========================================
+Code                  Meaning
+====================  ==========================================
+0                     missing, or below low if ``low_color`` set
+1 to 2**bits - 2      values between low and high
+2**bits - 1           above high
+====================  ==========================================
+
+.. note:: Changing low or high re-quantises displayed images, only
+          transparent values of ``low_color`` are reproduced
+
+.. autoclass:: Quantiser
+    :members:
+
+"""
+import numpy as np
+import bokeh.colors
+import bokeh.models
+
+
+TRANSPARENT = bokeh.colors.RGB(0, 0, 0, a=0)
+
+DECODE = """
+var i = special_vars.index || 0;
+var offset = source.data["offset"][i];
+var scale = source.data["scale"][i];
+if (value == 0) {
+    return "NaN";
+}
+if (value == top) {
+    return "> " + (offset + scale * (top - 1)).toPrecision(4);
+}
+return (offset + scale * value).toPrecision(4);
+"""
+
+
+class Quantiser(object):
+    """Encode images as integer codes for a colour mapper
+
+    :param color_mapper: LinearColorMapper used to choose low and high
+    :param bits: either 8 or 16
+    """
+    def __init__(self, color_mapper, bits=8):
+        assert bits in (8, 16), "bits must be 8 or 16"
+        self.color_mapper = color_mapper
+        self.bits = bits
+        self.dtype = np.dtype("uint{}".format(bits))
+        self.top = 2**bits - 1
+        self.coded_mapper = bokeh.models.LinearColorMapper(
+                low=1,
+                high=self.top - 1,
+                palette=color_mapper.palette,
+                low_color=TRANSPARENT,
+                high_color=color_mapper.high_color,
+                nan_color=TRANSPARENT)
+        self.color_mapper.on_change("palette", self._sync)
+        self.color_mapper.on_change("high_color", self._sync)
+
+    def _sync(self, attr, old, new):
+        setattr(self.coded_mapper, attr, new)
+
+    def on_change(self, callback):
+        """Call callback() when displayed images need re-quantising"""
+        def wrapper(attr, old, new):
+            callback()
+        for attr in ("low", "high", "low_color"):
+            self.color_mapper.on_change(attr, wrapper)
+
+    def hover_formatter(self, source):
+        """Decode ``@image{custom}`` in hover tooltips"""
+        return bokeh.models.CustomJSHover(
+                args=dict(source=source, top=self.top),
+                code=DECODE)
+
+    def encode(self, data):
+        """Replace images with codes, adding offset and scale columns
+
+        Minimum and maximum of the original values are kept in ``min``
+        and ``max`` columns for :class:`forest.colors.SourceLimits`
+
+        :param data: dict with an ``image`` key
+        :returns: new dict suitable for a ColumnDataSource
+        """
+        images, offsets, scales, minimums, maximums = [], [], [], [], []
+        for values in data["image"]:
+            image, offset, scale = self.quantise(values)
+            images.append(image)
+            offsets.append(offset)
+            scales.append(scale)
+            minimums.append(_float(np.ma.masked_invalid(values).min()))
+            maximums.append(_float(np.ma.masked_invalid(values).max()))
+        data = dict(data)
+        data["image"] = images
+        data["offset"] = offsets
+        data["scale"] = scales
+        data["min"] = minimums
+        data["max"] = maximums
+        return data
+
+    def quantise(self, values):
+        """Integer codes representing values
+
+        :returns: (codes, offset, scale) where value = offset + scale * code
+        """
+        values = np.ma.masked_invalid(values)
+        low, high = self.limits(values)
+        scale = (high - low) / (self.top - 2)
+        if scale == 0:
+            scale = 1.
+        data = np.ma.getdata(values)
+        with np.errstate(invalid="ignore"):
+            codes = np.clip(np.round((data - low) / scale), 0, self.top - 2) + 1
+            codes[data > high] = self.top
+            if self.color_mapper.low_color is not None:
+                codes[data < low] = 0
+        codes[np.ma.getmaskarray(values)] = 0
+        return codes.astype(self.dtype), low - scale, scale
+
+    def limits(self, values):
+        low, high = self.color_mapper.low, self.color_mapper.high
+        if (low is None) or (high is None):
+            # Mapper auto-ranges in the browser, follow the data
+            if values.count() == 0:
+                return 0., 1.
+            low, high = float(values.min()), float(values.max())
+        return float(low), float(high)
+
+
+def _float(value):
+    if value is np.ma.masked:
+        return np.nan
+    return float(value)
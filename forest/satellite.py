@@ -4,23 +4,42 @@ import netCDF4
 import numpy as np
 import os
 import glob
+import threading
 from functools import lru_cache
 from forest import (
         geo,
+        handles,
         locate)
-from forest.util import coarsify
 from forest.exceptions import FileNotFound, IndexNotFound
 
 
+#: Images are averaged over blocks of COARSEN_FACTOR by
+#: COARSEN_FACTOR pixels, a quarter of the full resolution
+COARSEN_FACTOR = 4
+
+
 class EIDA50(object):
-    def __init__(self, pattern):
+    """EIDA50 satellite imagery
+
+    Images are read through a :class:`forest.handles.DatasetPool`
+    so that stepping through a day re-uses one open file, and are
+    reduced by averaging blocks of pixels, see :func:`coarsen`
+
+    :param pool: DatasetPool, default :data:`forest.handles.POOL`
+    """
+    def __init__(self, pattern, pool=None):
         self.locator = Locator(pattern)
+        self.pool = handles.POOL if pool is None else pool
         self.cache = {}
         paths = self.locator.paths()
         if len(paths) > 0:
             with netCDF4.Dataset(paths[-1]) as dataset:
                 self.cache["longitude"] = dataset.variables["longitude"][:]
                 self.cache["latitude"] = dataset.variables["latitude"][:]
+            # Coordinates of the fixed grid are coarsened once
+            self.cache["coarse"] = (
+                    coarsen_axis(self.cache["longitude"]),
+                    coarsen_axis(self.cache["latitude"]))
 
     @property
     def longitudes(self):
@@ -35,28 +54,61 @@ class EIDA50(object):
         return self.load_image(path, itime)
 
     def load_image(self, path, itime):
-        lons = self.longitudes
-        lats = self.latitudes
-        with netCDF4.Dataset(path) as dataset:
+        lons, lats = self.cache["coarse"]
+        with self.pool.dataset(path) as dataset:
             values = dataset.variables["data"][itime]
-        fraction = 0.25
-        lons, lats, values = coarsify(
-                lons, lats, values, fraction)
+        values = coarsen(values)
         return geo.stretch_image(
                 lons, lats, values)
 
 
+def coarsen(values, factor=COARSEN_FACTOR):
+    """Average non-overlapping blocks of factor by factor pixels
+
+    Like :func:`forest.pyramid.block_mean` masked or NaN pixels are
+    ignored and trailing rows and columns are dropped, but blocks
+    of any size are reduced in a single pass over unmasked data
+
+    :returns: masked array, blocks without valid pixels are masked
+    """
+    ny, nx = values.shape
+    ny, nx = factor * (ny // factor), factor * (nx // factor)
+    data = np.ma.filled(
+            np.ma.asarray(values[:ny, :nx], dtype="f4"), np.nan)
+    valid = ~np.isnan(data)
+    data[~valid] = 0
+    shape = (ny // factor, factor, nx // factor, factor)
+    sums = data.reshape(shape).sum(axis=(1, 3))
+    counts = valid.reshape(shape).sum(axis=(1, 3))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    return np.ma.masked_array(means, counts == 0)
+
+
+def coarsen_axis(values, factor=COARSEN_FACTOR):
+    """Coordinates matching :func:`coarsen`"""
+    values = np.ma.getdata(values)
+    n = factor * (len(values) // factor)
+    return values[:n].reshape(-1, factor).mean(axis=1)
+
+
 class Locator(object):
-    """Locate EIDA50 satellite images"""
+    """Locate EIDA50 satellite images
+
+    File names and dates are kept in an index sorted by date that
+    is only rebuilt when the modification time of a directory
+    matched by the pattern changes
+    """
     def __init__(self, pattern):
         self.pattern = pattern
+        self._index = None
+        self._lock = threading.Lock()
 
     def find(self, date):
         if isinstance(date, (dt.datetime, str)):
             date = np.datetime64(date, 's')
-        paths = self.paths()
-        ipath = self.find_file_index(paths, date)
-        path = paths[ipath]
+        paths, dates = self.index()
+        path = paths[self.search(dates, date)]
         time_axis = self.load_time_axis(path)
         index = self.find_index(
                 time_axis,
@@ -65,7 +117,35 @@ class Locator(object):
         return path, index
 
     def paths(self):
-        return sorted(glob.glob(os.path.expanduser(self.pattern)))
+        return sorted(self.index()[0])
+
+    def index(self):
+        """Paths and dates of files sorted by date
+
+        :returns: tuple of path array and datetime64 array
+        """
+        pattern = os.path.expanduser(self.pattern)
+        key = directory_mtimes(pattern)
+        with self._lock:
+            if (self._index is None) or (self._index[0] != key):
+                paths = sorted(glob.glob(pattern))
+                dates = np.array([
+                    self._parse_date(path) for path in paths],
+                    dtype='datetime64[s]')
+                order = np.argsort(dates, kind="stable")
+                self._index = (
+                        key,
+                        np.array(paths, dtype=object)[order],
+                        dates[order])
+            return self._index[1:]
+
+    @classmethod
+    def _parse_date(cls, path):
+        try:
+            return cls.parse_date(path)
+        except TypeError:
+            # File name without a date
+            return None
 
     @staticmethod
     @lru_cache()
@@ -80,13 +160,21 @@ class Locator(object):
         dates = np.array([
             self.parse_date(path) for path in paths],
             dtype='datetime64[s]')
-        mask = ~(dates <= date)
-        if mask.all():
+        order = np.argsort(dates, kind="stable")
+        return order[self.search(dates[order], date)]
+
+    @staticmethod
+    def search(dates, date):
+        """Index of latest date on or before date
+
+        :param dates: sorted datetime64 array
+        """
+        i = np.searchsorted(dates, date, side="right") - 1
+        if i < 0:
             msg = "No file for {}".format(date)
             raise FileNotFound(msg)
-        before_dates = np.ma.array(
-                dates, mask=mask, dtype='datetime64[s]')
-        return np.ma.argmax(before_dates)
+        # First of several files with the same date
+        return np.searchsorted(dates, dates[i], side="left")
 
     @staticmethod
     def find_index(times, time, length):
@@ -94,14 +182,29 @@ class Locator(object):
         if isinstance(times, list):
             times = np.asarray(times, dtype=dtype)
         bounds = locate.bounds(times, length)
-        inside = locate.in_bounds(bounds, time)
-        valid_times = np.ma.array(times, mask=~inside)
-        if valid_times.mask.all():
+        inside = np.flatnonzero(locate.in_bounds(bounds, time))
+        if len(inside) == 0:
             msg = "{}: not found".format(time)
             raise IndexNotFound(msg)
-        return np.ma.argmax(valid_times)
+        return inside[np.argmax(times[inside])]
 
     @staticmethod
     def parse_date(path):
         groups = re.search(r"([0-9]{8})\.nc", path)
         return dt.datetime.strptime(groups[1], "%Y%m%d")
+
+
+def directory_mtimes(pattern):
+    """Modification times of directories that may hold matching files"""
+    directory = os.path.dirname(pattern) or "."
+    if glob.has_magic(directory):
+        directories = sorted(glob.glob(directory))
+    else:
+        directories = [directory]
+    mtimes = []
+    for directory in directories:
+        try:
+            mtimes.append((directory, os.stat(directory).st_mtime_ns))
+        except OSError:
+            mtimes.append((directory, None))
+    return tuple(mtimes)
@@ -54,14 +54,15 @@ import copy
 import datetime as dt
 import glob
 import os
+from functools import partial
 from itertools import cycle
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 import bokeh.palettes
 import numpy as np
 import netCDF4
-from forest import geo
+from forest import geo, catalogue, series_store
 from forest.observe import Observable
-from forest.util import initial_time as _initial_time
+from forest.util import NETCDF_LOCK
 from forest.gridded_forecast import _to_datetime
 try:
     import iris
@@ -138,10 +139,22 @@ class SeriesView(Observable):
 
     Responsible for keeping the lines on the series figure
     up to date.
+
+    Given an executor and a document, series of each file group
+    are loaded in parallel and applied on the next tick. Requests
+    waiting in the executor are cancelled when a newer request
+    arrives and results of superseded requests are discarded, so a
+    burst of taps only loads the latest position.
+
+    :param executor: optional :class:`concurrent.futures.Executor`
+    :param document: bokeh document needed by asynchronous renders
     """
-    def __init__(self, figure, loaders):
+    def __init__(self, figure, loaders, executor=None, document=None):
         self.figure = figure
         self.loaders = loaders
+        self.executor = executor
+        self.document = document
+        self.futures = {}
         self.sources = {}
         circles = []
         items = []
@@ -198,8 +211,11 @@ class SeriesView(Observable):
         super().__init__()
 
     @classmethod
-    def from_groups(cls, figure, groups, directory=None):
-        """Factory method to load from :class:`~forest.config.FileGroup` objects"""
+    def from_groups(cls, figure, groups, directory=None, **kwargs):
+        """Factory method to load from :class:`~forest.config.FileGroup` objects
+
+        .. note:: keyword arguments are passed to :class:`SeriesView`
+        """
         loaders = {}
         for group in groups:
             if group.file_type == "unified_model":
@@ -208,7 +224,7 @@ class SeriesView(Observable):
                 else:
                     pattern = os.path.join(directory, group.full_pattern)
                 loaders[group.label] = SeriesLoader.from_pattern(pattern)
-        return cls(figure, loaders)
+        return cls(figure, loaders, **kwargs)
 
     def on_tap(self, event):
         self.notify(set_position(event.x, event.y))
@@ -217,22 +233,64 @@ class SeriesView(Observable):
         """Update data for a particular application setting"""
         assert isinstance(initial_time, dt.datetime), "only support datetime"
         self.figure.title.text = variable
+        lon, lat = geo.plate_carree(x, y)
+        lon, lat = lon[0], lat[0]  # Map to scalar
+        args = (initial_time, variable, lon, lat, pressure)
         for name, source in self.sources.items():
             loader = self.loaders[name]
-            lon, lat = geo.plate_carree(x, y)
-            lon, lat = lon[0], lat[0]  # Map to scalar
-            source.data = loader.series(
-                    initial_time,
-                    variable,
-                    lon,
-                    lat,
-                    pressure)
+            if (self.executor is None) or (self.document is None):
+                source.data = loader.series(*args)
+            else:
+                self.submit(name, loader, args)
+
+    def submit(self, name, loader, args):
+        """Load series in executor, cancelling superseded loads"""
+        previous = self.futures.get(name)
+        if previous is not None:
+            previous.cancel()
+        future = self.executor.submit(loader.series, *args)
+        self.futures[name] = future
+        future.add_done_callback(partial(self.on_load, name))
+
+    def on_load(self, name, future):
+        """Schedule document update, called from executor thread"""
+        if future.cancelled() or (self.futures.get(name) is not future):
+            return
+        self.document.add_next_tick_callback(
+                partial(self.on_tick, name, future))
+
+    def on_tick(self, name, future):
+        """Apply loaded series unless a newer load has been submitted"""
+        if self.futures.get(name) is not future:
+            return
+        del self.futures[name]
+        exception = future.exception()
+        if exception is not None:
+            print("SeriesView: {} failed to load: {}".format(name, exception))
+            self.sources[name].data = {"x": [], "y": []}
+            raise exception
+        self.sources[name].data = future.result()
+
+
+PointIndex = namedtuple("PointIndex", (
+    "longitudes",
+    "latitudes",
+    "times",
+    "pressures",
+    "ndim"))
+PointIndex.__doc__ = """Coordinates of a variable needed to extract points"""
 
 
 class SeriesLoader(object):
-    """Time series loader"""
+    """Time series loader
+
+    Coordinates of each file are read once and kept in memory,
+    a tap then costs one strided read of the nearest grid point
+    per file
+    """
     def __init__(self, paths):
         self.locator = SeriesLocator(paths)
+        self._indices = {}
 
     @classmethod
     def from_pattern(cls, pattern):
@@ -244,8 +302,20 @@ class SeriesLoader(object):
             lon0,
             lat0,
             pressure=None):
-        data = {"x": [], "y": []}
+        """Values at the nearest grid point in files of a forecast
+
+        :returns: dict with "x" datetime64 and "y" value arrays
+        """
         paths = self.locator.locate(initial_time)
+        if len(paths) > 0:
+            store = series_store.store_path(
+                    paths, self.locator.key(initial_time))
+            if series_store.is_current(store, paths):
+                data = series_store.read_point(
+                        store, variable, lon0, lat0, pressure=pressure)
+                if data is not None:
+                    return data
+        xs, ys = [], []
         for path in paths:
             segment = self.series_file(
                     path,
@@ -253,14 +323,21 @@ class SeriesLoader(object):
                     lon0,
                     lat0,
                     pressure=pressure)
-            data["x"] += list(segment["x"])
-            data["y"] += list(segment["y"])
-        return data
+            xs.append(np.asarray(segment["x"], dtype="datetime64[s]"))
+            ys.append(np.ma.filled(
+                np.ma.asarray(segment["y"], dtype="f8").ravel(), np.nan))
+        if len(xs) == 0:
+            return {
+                "x": np.array([], dtype="datetime64[s]"),
+                "y": np.array([], dtype="f8")}
+        return {
+            "x": np.concatenate(xs),
+            "y": np.concatenate(ys)}
 
     def series_file(self, *args, **kwargs):
         try:
             return self._load_netcdf4(*args, **kwargs)
-        except:
+        except Exception:
             return self._load_cube(*args, **kwargs)
 
     def _load_cube(self, path, variable, lon0, lat0, pressure=None):
@@ -293,35 +370,57 @@ class SeriesLoader(object):
             "y": values}
 
     def _load_netcdf4(self, path, variable, lon0, lat0, pressure=None):
-        with netCDF4.Dataset(path) as dataset:
-            try:
-                var = dataset.variables[variable]
-            except KeyError:
+        with NETCDF_LOCK, netCDF4.Dataset(path) as dataset:
+            index = self.point_index(path, dataset, variable)
+            if index is None:
                 return {"x": [], "y": []}
-            lons = geo.to_180(self._longitudes(dataset, var))
-            lats = self._latitudes(dataset, var)
-            i = np.argmin(np.abs(lons - lon0))
-            j = np.argmin(np.abs(lats - lat0))
-            times = self._times(dataset, var)
-            values = var[..., j, i]
-            if (
-                    ("pressure" in var.coordinates) or
-                    ("pressure" in var.dimensions)):
-                pressures = self._pressures(dataset, var)
-                if len(var.dimensions) == 3:
-                    pts = self.search(pressures, pressure)
-                    values = values[pts]
-                    if isinstance(times, dt.datetime):
-                        times = [times]
-                    else:
-                        times = times[pts]
+            var = dataset.variables[variable]
+            i = np.argmin(np.abs(index.longitudes - lon0))
+            j = np.argmin(np.abs(index.latitudes - lat0))
+            times = index.times
+            if index.pressures is None:
+                values = var[..., j, i]
+            elif index.ndim == 3:
+                # Time and pressure share the leading axis
+                pts = self.search(index.pressures, pressure)
+                values = var[:, j, i][pts]
+                if times.ndim == 0:
+                    times = np.repeat(times, np.count_nonzero(pts))
                 else:
-                    mask = self.search(pressures, pressure)
-                    values = values[:, mask][:, 0]
+                    times = times[pts]
+            else:
+                k = np.where(self.search(index.pressures, pressure))[0][0]
+                values = var[:, k, j, i]
         return {
             "x": times,
             "y": values}
 
+    def point_index(self, path, dataset, variable):
+        """Coordinates of a variable, read once per file
+
+        :returns: :class:`PointIndex` or None if variable not in dataset
+        """
+        key = (path, variable)
+        if key not in self._indices:
+            try:
+                var = dataset.variables[variable]
+            except KeyError:
+                self._indices[key] = None
+                return None
+            if (
+                    ("pressure" in getattr(var, "coordinates", "")) or
+                    ("pressure" in var.dimensions)):
+                pressures = np.asarray(self._pressures(dataset, var))
+            else:
+                pressures = None
+            self._indices[key] = PointIndex(
+                    np.asarray(geo.to_180(self._longitudes(dataset, var))),
+                    np.asarray(self._latitudes(dataset, var)),
+                    self._times(dataset, var),
+                    pressures,
+                    len(var.dimensions))
+        return self._indices[key]
+
     @staticmethod
     def _times(dataset, variable):
         """Find times related to variable in dataset"""
@@ -331,7 +430,7 @@ class SeriesLoader(object):
             if c.startswith("time"):
                 try:
                     var = dataset.variables[c]
-                    return netCDF4.num2date(var[:], units=var.units)
+                    return _num2date(var)
                 except KeyError:
                     pass
         for v, var in dataset.variables.items():
@@ -340,7 +439,7 @@ class SeriesLoader(object):
             if v.startswith("time"):
                 d = var.dimensions[0]
                 if d == time_dimension:
-                    return netCDF4.num2date(var[:], units=var.units)
+                    return _num2date(var)
 
     def _pressures(self, dataset, variable):
         return self._dimension("pressure", dataset, variable)
@@ -369,20 +468,25 @@ class SeriesLoader(object):
         return np.abs(pressures - pressure) < (rtol * pressure)
 
 
+def _num2date(var):
+    """Decode times to datetime64 without cftime objects"""
+    return np.array(netCDF4.num2date(
+        var[:],
+        units=var.units,
+        only_use_cftime_datetimes=False,
+        only_use_python_datetimes=True), dtype="datetime64[s]")
+
+
 class SeriesLocator(object):
     """Helper to find files related to Series"""
     def __init__(self, paths):
         self.paths = paths
         self.table = defaultdict(list)
+        initial_times = catalogue.initial_times(paths)
         for path in paths:
-            time = _initial_time(path)
+            time = initial_times[path]
             if time is None:
-                try:
-                    with netCDF4.Dataset(path) as dataset:
-                        var = dataset.variables["forecast_reference_time"]
-                        time = netCDF4.num2date(var[:], units=var.units)
-                except KeyError:
-                    continue
+                continue
             self.table[self.key(time)].append(path)
 
     def initial_times(self):
@@ -399,4 +503,8 @@ class SeriesLocator(object):
     __getitem__ = locate
 
     def key(self, time):
+        if isinstance(time, str):
+            return time
+        if isinstance(time, np.datetime64):
+            time = time.astype(dt.datetime)
         return "{:%Y-%m-%d %H:%M:%S}".format(time)
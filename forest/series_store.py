@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Time series stores
+------------------
+
+Model output is written one lead time per file, so a time series at
+a point touches every file of a forecast. A series store holds the
+same data re-chunked so that all lead times of a small patch of grid
+points are contiguous on disk, turning a tap into one read per
+variable.
+
+Stores are NetCDF4 files written by an offline conversion step into
+a hidden ``.forest-series`` directory next to the model files, one
+file per initial time and one group per variable.
+
+.. code-block:: sh
+
+   python -m forest.series_store /path/to/file_20190101T0000Z_*.nc
+
+:class:`forest.series.SeriesLoader` uses a store when it exists and
+is newer than every file it was made from, otherwise it falls back
+to reading model files.
+
+.. autofunction:: convert
+
+.. autofunction:: store_path
+
+"""
+import argparse
+import datetime as dt
+import os
+from collections import defaultdict
+import numpy as np
+import netCDF4
+from forest import catalogue
+from forest.util import NETCDF_LOCK
+
+
+#: Directory, relative to model files, holding stores
+DIRECTORY = ".forest-series"
+
+#: Grid points along each horizontal axis of a chunk
+CHUNK_SIZE = 16
+
+#: Units of the time coordinate written to stores
+UNITS = "seconds since 1970-01-01 00:00:00"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="write time-contiguous copies of model output")
+    parser.add_argument(
+        "--variable", action="append", dest="variables", metavar="NAME",
+        help="variable to convert, may be repeated, default all")
+    parser.add_argument(
+        "paths", nargs="+", metavar="FILE",
+        help="unified model netcdf files")
+    return parser.parse_args(args=argv)
+
+
+def main(argv=None):
+    args = parse_args(argv=argv)
+    forecasts = defaultdict(list)
+    for path, initial_time in catalogue.initial_times(args.paths).items():
+        if initial_time is not None:
+            forecasts[_key(initial_time)].append(path)
+    for key, paths in sorted(forecasts.items()):
+        path = store_path(paths, key)
+        names = convert(sorted(paths), path, variables=args.variables)
+        print("series_store: wrote {} variables to {}".format(
+            len(names), path))
+
+
+def store_path(paths, initial_time):
+    """Location of the store of a forecast
+
+    :param paths: model files of the forecast
+    :param initial_time: datetime or ``"%Y-%m-%d %H:%M:%S"`` string
+    """
+    directory = os.path.join(os.path.dirname(paths[0]), DIRECTORY)
+    return os.path.join(directory, "{}.nc".format(_stamp(initial_time)))
+
+
+def _key(time):
+    return "{:%Y-%m-%d %H:%M:%S}".format(time)
+
+
+def _stamp(time):
+    if isinstance(time, str):
+        time = dt.datetime.strptime(time, "%Y-%m-%d %H:%M:%S")
+    return "{:%Y%m%dT%H%M%SZ}".format(time)
+
+
+def is_current(path, paths):
+    """True if store exists and is newer than every model file"""
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return False
+    return all(os.stat(p).st_mtime <= mtime for p in paths)
+
+
+def convert(paths, path, variables=None):
+    """Write variables of a forecast to a store
+
+    Variables whose time and pressure share an axis, or whose grid or
+    pressure levels differ between files, are skipped
+
+    :param paths: model files of one forecast
+    :param path: store to create
+    :param variables: names to convert, default all
+    :returns: names of converted variables
+    """
+    from forest.series import SeriesLoader
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    loader = SeriesLoader([])
+    if variables is None:
+        variables = set()
+        for p in paths:
+            with netCDF4.Dataset(p) as dataset:
+                variables.update(_data_variables(dataset))
+        variables = sorted(variables)
+    written = []
+    tmp = path + ".tmp"
+    with netCDF4.Dataset(tmp, "w") as store:
+        for variable in variables:
+            indices = []
+            for p in paths:
+                with netCDF4.Dataset(p) as dataset:
+                    try:
+                        index = loader.point_index(p, dataset, variable)
+                    except Exception:
+                        index = None
+                if index is not None:
+                    indices.append((p, index))
+            if _convertible([index for _, index in indices]):
+                _write(store.createGroup(variable), variable, indices)
+                written.append(variable)
+    os.replace(tmp, path)
+    return written
+
+
+def _data_variables(dataset):
+    referenced = set(dataset.dimensions)
+    for var in dataset.variables.values():
+        referenced.update(getattr(var, "coordinates", "").split())
+    return [name for name, var in dataset.variables.items()
+            if (name not in referenced) and (len(var.dimensions) >= 2)]
+
+
+def _convertible(indices):
+    if len(indices) == 0:
+        return False
+    first = indices[0]
+    for index in indices:
+        if index.times is None:
+            return False
+        if (index.pressures is not None) and (index.ndim == 3) and (
+                index.times.ndim > 0):
+            # Time and pressure share the leading axis
+            return False
+        for attr in ("longitudes", "latitudes", "pressures"):
+            a, b = getattr(first, attr), getattr(index, attr)
+            if (a is None) != (b is None):
+                return False
+            if (a is not None) and not np.array_equal(a, b):
+                return False
+    return True
+
+
+def _write(group, variable, indices):
+    first = indices[0][1]
+    times = np.concatenate([np.atleast_1d(index.times)
+                            for _, index in indices])
+    group.createDimension("time", len(times))
+    group.createDimension("latitude", len(first.latitudes))
+    group.createDimension("longitude", len(first.longitudes))
+    dims = ("time", "latitude", "longitude")
+    chunks = [len(times), CHUNK_SIZE, CHUNK_SIZE]
+    if first.pressures is not None:
+        group.createDimension("pressure", len(first.pressures))
+        var = group.createVariable("pressure", "f8", ("pressure",))
+        var[:] = first.pressures
+        dims = ("time", "pressure", "latitude", "longitude")
+        chunks.insert(1, 1)
+    var = group.createVariable("time", "f8", ("time",))
+    var.units = UNITS
+    var[:] = (times - np.datetime64("1970-01-01", "s")).astype("f8")
+    var = group.createVariable("latitude", "f8", ("latitude",))
+    var[:] = first.latitudes
+    var = group.createVariable("longitude", "f8", ("longitude",))
+    var[:] = first.longitudes
+    chunks = [min(c, len(group.dimensions[d])) for c, d in zip(chunks, dims)]
+    values = group.createVariable(
+            "values", "f4", dims, chunksizes=chunks, fill_value=np.nan)
+    start = 0
+    for path, index in indices:
+        with netCDF4.Dataset(path) as dataset:
+            data = dataset.variables[variable][:]
+        if np.ndim(index.times) == 0:
+            data = data[np.newaxis]
+        data = np.ma.filled(np.ma.asarray(data, dtype="f4"), np.nan)
+        values[start:start + len(data)] = data
+        start += len(data)
+
+
+def read_point(path, variable, lon0, lat0, pressure=None, rtol=0.01):
+    """Series at the grid point nearest lon0, lat0 read from a store
+
+    :returns: dict with "x" and "y" arrays or None if variable,
+              or the requested pressure, is not in the store
+    """
+    with NETCDF_LOCK, netCDF4.Dataset(path) as dataset:
+        if variable not in dataset.groups:
+            return None
+        group = dataset.groups[variable]
+        i = np.argmin(np.abs(group.variables["longitude"][:] - lon0))
+        j = np.argmin(np.abs(group.variables["latitude"][:] - lat0))
+        seconds = group.variables["time"][:]
+        values = group.variables["values"]
+        if "pressure" in group.variables:
+            if pressure is None:
+                return None
+            pressures = group.variables["pressure"][:]
+            pts = np.where(np.abs(pressures - pressure) < (rtol * pressure))[0]
+            if len(pts) == 0:
+                return None
+            y = values[:, pts[0], j, i]
+        else:
+            y = values[:, j, i]
+    x = np.datetime64("1970-01-01", "s") + seconds.astype("i8").astype(
+            "timedelta64[s]")
+    return {"x": x, "y": np.ma.filled(np.ma.asarray(y, dtype="f8"), np.nan)}
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,12 @@
 import forest.data as data
 
 
+#: Interval between image cache statistics in the server log
+CACHE_LOG_INTERVAL_MS = 5 * 60 * 1000
+
+
 def on_server_loaded(server_context):
     data.on_server_loaded()
+    server_context.add_periodic_callback(
+            data.log_image_cache,
+            CACHE_LOG_INTERVAL_MS)
@@ -0,0 +1,119 @@
+"""
+Sidecar coordinate cache
+------------------------
+
+Without a database, menus are populated by opening every matching
+file. A sidecar cache stores the answers in a SQLite file so that
+later runs, and other server processes, only read files that have
+been added or changed since. Entries are keyed on path, modification
+time and size, so a rewritten file is read again automatically.
+
+>>> coordinates = CoordinateCache(unified_model.Coordinates(), "menus.db")
+>>> navigator = FileSystemNavigator(paths, coordinates)
+
+.. autoclass:: CoordinateCache
+    :members:
+
+"""
+import os
+import pickle
+import sqlite3
+import threading
+from forest.exceptions import (
+        InitialTimeNotFound,
+        ValidTimesNotFound,
+        PressuresNotFound)
+
+
+#: Exceptions raised by Coordinates that are cached like results
+CACHED_EXCEPTIONS = (
+        InitialTimeNotFound,
+        ValidTimesNotFound,
+        PressuresNotFound)
+
+
+class CoordinateCache(object):
+    """Coordinates wrapper that remembers results on disk
+
+    :param coordinates: object with ``variables``, ``initial_time``,
+                        ``valid_times`` and ``pressures`` methods,
+                        e.g. :class:`forest.unified_model.Coordinates`
+    :param path: SQLite file, created if it does not exist
+    """
+    def __init__(self, coordinates, path):
+        self.coordinates = coordinates
+        self.kind = "{}.{}".format(
+                type(coordinates).__module__,
+                type(coordinates).__name__)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS coordinate (
+                        path TEXT NOT NULL,
+                        kind TEXT NOT NULL,
+                        method TEXT NOT NULL,
+                        variable TEXT NOT NULL,
+                        mtime REAL,
+                        size INTEGER,
+                        value BLOB,
+                        PRIMARY KEY(path, kind, method, variable))
+            """)
+            self.connection.commit()
+
+    def variables(self, path):
+        return self._call("variables", path)
+
+    def initial_time(self, path):
+        return self._call("initial_time", path)
+
+    def valid_times(self, path, variable):
+        return self._call("valid_times", path, variable)
+
+    def pressures(self, path, variable):
+        return self._call("pressures", path, variable)
+
+    def _call(self, method, path, variable=None):
+        args = (path,) if variable is None else (path, variable)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return getattr(self.coordinates, method)(*args)
+        key = dict(
+                path=path,
+                kind=self.kind,
+                method=method,
+                variable="" if variable is None else variable)
+        with self._lock:
+            row = self.connection.execute("""
+                SELECT mtime, size, value
+                  FROM coordinate
+                 WHERE path = :path
+                   AND kind = :kind
+                   AND method = :method
+                   AND variable = :variable
+            """, key).fetchone()
+        if (row is not None) and (row[:2] == (stat.st_mtime, stat.st_size)):
+            value = pickle.loads(row[2])
+        else:
+            try:
+                value = getattr(self.coordinates, method)(*args)
+            except CACHED_EXCEPTIONS as exception:
+                value = exception
+            with self._lock:
+                self.connection.execute("""
+                    INSERT OR REPLACE INTO coordinate
+                           (path, kind, method, variable, mtime, size, value)
+                    VALUES (:path, :kind, :method, :variable,
+                            :mtime, :size, :value)
+                """, dict(
+                    key,
+                    mtime=stat.st_mtime,
+                    size=stat.st_size,
+                    value=pickle.dumps(value)))
+                self.connection.commit()
+        if isinstance(value, CACHED_EXCEPTIONS):
+            raise value
+        return value
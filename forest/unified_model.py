@@ -5,7 +5,7 @@ import fnmatch
 import datetime as dt
 import numpy as np
 import netCDF4
-from forest import disk
+from forest import disk, catalogue
 from forest.exceptions import SearchFail, PressuresNotFound
 try:
     import iris
@@ -39,8 +39,10 @@ class Locator(object):
         self.paths = paths
         self.spare = []
         self.catalogue = {}
+        self._axes = {}
+        initial_times = catalogue.initial_times(paths)
         for path in paths:
-            initial_time = self.initial_time(path)
+            initial_time = initial_times[path]
             if initial_time is None:
                 self.spare.append(path)
                 continue
@@ -65,36 +67,25 @@ class Locator(object):
         paths = self.find_paths(initial_time) + self.spare
         paths = fnmatch.filter(paths, pattern)
         for path in paths:
-            with netCDF4.Dataset(path) as dataset:
-                if variable not in dataset.variables:
-                    continue
+            axes = self.axes(path, variable)
+            if axes is None:
+                continue
 
-                var = dataset.variables[variable]
-                dims = var.dimensions
-                coords = getattr(var, "coordinates", "")
-
-                masks = {}
-                for coord, value in [
-                        ("time", valid_time),
-                        ("pressure", pressure)]:
-                    if not disk.has_coord(coord, dims, coords):
-                        continue
-                    if value is None:
-                        # Coordinate present but value not specified
-                        raise SearchFail("Please specify: '{}'".format(coord))
-                        continue
-                    axis = disk.axis(coord, dims, coords)
-                    coord_var = disk.coord_var(coord, dims, coords)
-                    if coord == "time":
-                        obj = dataset.variables[coord_var]
-                        values = netCDF4.num2date(obj[:], units=obj.units)
-                    else:
-                        values = dataset.variables[coord_var][:]
-                    mask = disk.coord_mask(coord, values, value)
-                    if axis not in masks:
-                        masks[axis] = mask
-                    else:
-                        masks[axis] = masks[axis] & mask
+            masks = {}
+            for coord, value in [
+                    ("time", valid_time),
+                    ("pressure", pressure)]:
+                if coord not in axes:
+                    continue
+                if value is None:
+                    # Coordinate present but value not specified
+                    raise SearchFail("Please specify: '{}'".format(coord))
+                axis, values = axes[coord]
+                mask = disk.coord_mask(coord, values, value)
+                if axis not in masks:
+                    masks[axis] = mask
+                else:
+                    masks[axis] = masks[axis] & mask
 
             # Determine if search was successful
             found = all(mask.any() for mask in masks.values())
@@ -114,6 +105,45 @@ class Locator(object):
             [pattern, variable, initial_time, valid_time, pressure]])
         raise SearchFail(msg)
 
+    def axes(self, path, variable):
+        """Axis and coordinate values of a variable held in memory
+
+        Files are read once, later searches only compare arrays
+
+        :returns: dict of coordinate name to (axis, values) or None
+                  if variable is not in file
+        """
+        key = (path, variable)
+        if key not in self._axes:
+            self._axes[key] = self._read_axes(path, variable)
+        return self._axes[key]
+
+    @staticmethod
+    def _read_axes(path, variable):
+        with netCDF4.Dataset(path) as dataset:
+            if variable not in dataset.variables:
+                return None
+            var = dataset.variables[variable]
+            dims = var.dimensions
+            coords = getattr(var, "coordinates", "")
+            result = {}
+            for coord in ("time", "pressure"):
+                if not disk.has_coord(coord, dims, coords):
+                    continue
+                axis = disk.axis(coord, dims, coords)
+                obj = dataset.variables[disk.coord_var(coord, dims, coords)]
+                if coord == "time":
+                    values = np.array(netCDF4.num2date(
+                        obj[:],
+                        units=obj.units,
+                        only_use_cftime_datetimes=False,
+                        only_use_python_datetimes=True),
+                        dtype="datetime64[s]")
+                else:
+                    values = np.array(obj[:])
+                result[coord] = (axis, values)
+        return result
+
     def find_paths(self, initial_time):
         return self.catalogue.get(self.key(initial_time), [])
 
@@ -1,11 +1,17 @@
 import os
 import re
+import threading
 import datetime as dt
 from functools import partial
 import scipy.ndimage
 import numpy as np
 
 
+#: netCDF-C and HDF5 are not thread-safe, reads performed outside
+#: the document thread, e.g. by prefetch or render workers, hold this lock
+NETCDF_LOCK = threading.RLock()
+
+
 def timeout_cache(interval):
     def decorator(f):
         cache = {}
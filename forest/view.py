@@ -5,17 +5,38 @@ from forest import geo
 from forest.exceptions import FileNotFound, IndexNotFound
 
 
+def encode(quantiser, data):
+    """Quantise images if a :class:`forest.quantise.Quantiser` is given"""
+    if quantiser is None:
+        return data
+    return quantiser.encode(data)
+
+
+def image_mapper(quantiser, color_mapper):
+    """Colour mapper matching images produced by :func:`encode`"""
+    if quantiser is None:
+        return color_mapper
+    return quantiser.coded_mapper
+
+
 class UMView(object):
-    def __init__(self, loader, color_mapper):
+    def __init__(self, loader, color_mapper, quantiser=None):
         self.loader = loader
+        self.viewport = None
         self.color_mapper = color_mapper
         self.color_mapper.nan_color = bokeh.colors.RGB(0, 0, 0, a=0) 
-        self.source = bokeh.models.ColumnDataSource({
+        self.quantiser = quantiser
+        self.data = None
+        self.empty = {
                 "x": [],
                 "y": [],
                 "dw": [],
                 "dh": [],
-                "image": []})
+                "image": []}
+        self.source = bokeh.models.ColumnDataSource(
+                encode(quantiser, self.empty))
+        if quantiser is not None:
+            quantiser.on_change(self.refresh)
 
         self.tooltips = [
             ("Name", "@name"),
@@ -31,7 +52,28 @@ class UMView(object):
         }
 
     def render(self, state):
-        self.source.data = self.loader.image(state)
+        self.update(self.load(state))
+
+    @property
+    def zoomable(self):
+        """Loader serves images for the current viewport"""
+        return getattr(self.loader, "zoomable", False)
+
+    def load(self, state):
+        """Load image data, safe to call outside the document thread"""
+        if self.zoomable and (self.viewport is not None):
+            return self.loader.image(state, self.viewport)
+        return self.loader.image(state)
+
+    def update(self, data):
+        """Apply loaded data to bokeh models"""
+        self.data = data
+        self.source.data = encode(self.quantiser, data)
+
+    def refresh(self):
+        """Re-apply latest data, e.g. after colour mapper limits change"""
+        if self.data is not None:
+            self.update(self.data)
 
     def set_hover_properties(self, tooltips, formatters):
         self.tooltips = tooltips
@@ -45,11 +87,18 @@ class UMView(object):
                 dh="dh",
                 image="image",
                 source=self.source,
-                color_mapper=self.color_mapper)
+                color_mapper=image_mapper(self.quantiser, self.color_mapper))
+        tooltips, formatters = self.tooltips, self.formatters
+        if self.quantiser is not None:
+            tooltips = [
+                    (name, value.replace("@image", "@image{custom}"))
+                    for name, value in tooltips]
+            formatters = dict(formatters)
+            formatters["image"] = self.quantiser.hover_formatter(self.source)
         tool = bokeh.models.HoverTool(
                 renderers=[renderer],
-                tooltips=self.tooltips,
-                formatters=self.formatters)
+                tooltips=tooltips,
+                formatters=formatters)
         figure.add_tools(tool)
         return renderer
 
@@ -63,9 +112,10 @@ class Barbs(object):
 
 
 class GPMView(object):
-    def __init__(self, loader, color_mapper):
+    def __init__(self, loader, color_mapper, quantiser=None):
         self.loader = loader
         self.color_mapper = color_mapper
+        self.quantiser = quantiser
         self.empty = {
                 "lons": [],
                 "lats": [],
@@ -74,13 +124,24 @@ class GPMView(object):
                 "dw": [],
                 "dh": [],
                 "image": []}
-        self.source = bokeh.models.ColumnDataSource(self.empty)
+        self.data = self.empty
+        self.source = bokeh.models.ColumnDataSource(
+                encode(quantiser, self.empty))
+        if quantiser is not None:
+            quantiser.on_change(self.refresh)
 
     def render(self, variable, pressure, itime):
         if variable != "precipitation_flux":
-            self.source.data = self.empty
+            self.update(self.empty)
         else:
-            self.source.data = self.loader.image(itime)
+            self.update(self.loader.image(itime))
+
+    def update(self, data):
+        self.data = data
+        self.source.data = encode(self.quantiser, data)
+
+    def refresh(self):
+        self.update(self.data)
 
     def add_figure(self, figure):
         return figure.image(
@@ -90,24 +151,45 @@ class GPMView(object):
                 dh="dh",
                 image="image",
                 source=self.source,
-                color_mapper=self.color_mapper)
+                color_mapper=image_mapper(self.quantiser, self.color_mapper))
 
 class EIDA50(object):
-    def __init__(self, loader, color_mapper):
+    def __init__(self, loader, color_mapper, quantiser=None):
         self.loader = loader
         self.color_mapper = color_mapper
+        self.quantiser = quantiser
         self.empty = {
                 "x": [],
                 "y": [],
                 "dw": [],
                 "dh": [],
                 "image": []}
+        self.data = None
         self.source = bokeh.models.ColumnDataSource(
-                self.empty)
+                encode(quantiser, self.empty))
+        if quantiser is not None:
+            quantiser.on_change(self.refresh)
 
     def render(self, state):
-        if state.valid_time is not None:
-            self.image(self.to_datetime(state.valid_time))
+        self.update(self.load(state))
+
+    def load(self, state):
+        """Load image data, safe to call outside the document thread"""
+        if state.valid_time is None:
+            return
+        try:
+            return self.loader.image(self.to_datetime(state.valid_time))
+        except (FileNotFound, IndexNotFound):
+            return self.empty
+
+    def update(self, data):
+        """Apply loaded data to bokeh models"""
+        if data is not None:
+            self.data = data
+            self.source.data = encode(self.quantiser, data)
+
+    def refresh(self):
+        self.update(self.data)
 
     @staticmethod
     def to_datetime(d):
@@ -125,9 +207,9 @@ class EIDA50(object):
 
     def image(self, time):
         try:
-            self.source.data = self.loader.image(time)
+            self.update(self.loader.image(time))
         except (FileNotFound, IndexNotFound):
-            self.source.data = self.empty
+            self.update(self.empty)
 
     def add_figure(self, figure):
         return figure.image(
@@ -137,4 +219,4 @@ class EIDA50(object):
                 dh="dh",
                 image="image",
                 source=self.source,
-                color_mapper=self.color_mapper)
+                color_mapper=image_mapper(self.quantiser, self.color_mapper))
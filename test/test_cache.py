@@ -0,0 +1,87 @@
+import pytest
+import numpy as np
+from forest import data
+from forest.cache import LRUCache, nbytes
+
+
+def test_nbytes_given_image_dict():
+    image = {
+        "x": [0.],
+        "y": [0.],
+        "image": [np.zeros((10, 10), dtype="f")]}
+    assert nbytes(image) == 400
+
+
+def test_nbytes_given_masked_array_includes_mask():
+    values = np.ma.masked_array(np.zeros(10, dtype="f"), mask=False)
+    assert nbytes(values) == 50
+
+
+def test_lru_cache_counts_hits_and_misses():
+    cache = LRUCache()
+    cache["key"] = np.zeros(1)
+    cache.get("key")
+    cache.get("other")
+    info = cache.info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_bytes=16)
+    cache["a"] = np.zeros(1)
+    cache["b"] = np.zeros(1)
+    cache.get("a")
+    cache["c"] = np.zeros(1)
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.evictions == 1
+    assert cache.nbytes == 16
+
+
+def test_lru_cache_ignores_entries_larger_than_budget():
+    cache = LRUCache(max_bytes=8)
+    cache["a"] = np.zeros(1)
+    cache["b"] = np.zeros(2)
+    assert "a" in cache
+    assert "b" not in cache
+
+
+def test_lru_cache_resize_evicts_entries():
+    cache = LRUCache()
+    for key in "abcd":
+        cache[key] = np.zeros(1)
+    cache.resize(16)
+    assert len(cache) == 2
+    assert cache.nbytes == 16
+
+
+def test_lru_cache_replace_entry_updates_nbytes():
+    cache = LRUCache()
+    cache["a"] = np.zeros(2)
+    cache["a"] = np.zeros(1)
+    assert cache.nbytes == 8
+
+
+@pytest.mark.parametrize("megabytes,expect", [
+    (None, None),
+    (1, 1024**2),
+    (0.5, 512 * 1024),
+])
+def test_set_image_cache_size(megabytes, expect):
+    max_bytes = data.IMAGES.max_bytes
+    try:
+        data.set_image_cache_size(megabytes)
+        assert data.IMAGES.max_bytes == expect
+    finally:
+        data.IMAGES.resize(max_bytes)
+
+
+def test_images_has_default_budget():
+    assert data.IMAGES.max_bytes == data.DEFAULT_IMAGE_CACHE_MB * 1024**2
+
+
+def test_log_image_cache(capsys):
+    data.log_image_cache()
+    out, _ = capsys.readouterr()
+    assert out.startswith("IMAGES: ")
@@ -0,0 +1,59 @@
+import datetime as dt
+import pytest
+import netCDF4
+from forest import catalogue
+
+
+@pytest.fixture(autouse=True)
+def clear_catalogue():
+    catalogue.INITIAL_TIMES.clear()
+    yield
+    catalogue.INITIAL_TIMES.clear()
+
+
+def _write(path, reference_time):
+    units = "hours since 1970-01-01 00:00:00"
+    with netCDF4.Dataset(path, "w") as dataset:
+        var = dataset.createVariable("forecast_reference_time", "d", ())
+        var.units = units
+        var[:] = netCDF4.date2num(reference_time, units=units)
+
+
+def test_initial_times_given_time_in_file_name():
+    path = "/some/file_20190101T0000Z.nc"
+    result = catalogue.initial_times([path])
+    assert result == {path: dt.datetime(2019, 1, 1)}
+
+
+def test_initial_times_reads_file_once(tmpdir, monkeypatch):
+    path = str(tmpdir / "file.nc")
+    _write(path, dt.datetime(2019, 1, 1, 12))
+    calls = []
+    original = catalogue.reference_time
+
+    def reference_time(path):
+        calls.append(path)
+        return original(path)
+
+    monkeypatch.setattr(catalogue, "reference_time", reference_time)
+    for _ in range(2):
+        result = catalogue.initial_times([path])
+    assert calls == [path]
+    assert str(result[path]) == "2019-01-01 12:00:00"
+
+
+def test_initial_times_given_file_without_reference_time(tmpdir):
+    path = str(tmpdir / "file.nc")
+    with netCDF4.Dataset(path, "w"):
+        pass
+    assert catalogue.initial_times([path]) == {path: None}
+
+
+def test_initial_times_in_worker_processes(tmpdir, monkeypatch):
+    monkeypatch.setattr(catalogue, "MIN_PARALLEL", 2)
+    paths = [str(tmpdir / "file_{}.nc".format(i)) for i in range(2)]
+    for i, path in enumerate(paths):
+        _write(path, dt.datetime(2019, 1, 1, i))
+    result = catalogue.initial_times(paths, workers=2)
+    assert [str(result[path]) for path in paths] == [
+        "2019-01-01 00:00:00", "2019-01-01 01:00:00"]
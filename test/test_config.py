@@ -183,3 +183,12 @@ def test_config_parser_given_json(tmpdir):
     assert group.pattern == "*.nc"
     assert group.directory is None
     assert group.locator == "file_system"
+
+
+@pytest.mark.parametrize("data,expect", [
+    ({"files": []}, None),
+    ({"files": [], "image_cache_mb": 1024}, 1024),
+])
+def test_config_image_cache_mb(data, expect):
+    config = forest.config.Config(data)
+    assert config.image_cache_mb == expect
@@ -1,5 +1,8 @@
 from unittest.mock import Mock, sentinel
 import re
+import sqlite3
+import pytest
+import netCDF4
 
 import forest.db.database as database
 
@@ -7,6 +10,7 @@ import forest.db.database as database
 def _create_db():
     cursor = Mock()
     cursor.fetchall.return_value = [(sentinel.value1,), (sentinel.value2,)]
+    cursor.fetchone.return_value = (len(database.MIGRATIONS),)
     connection = Mock()
     connection.cursor.return_value = cursor
     db = database.Database(connection)
@@ -82,3 +86,137 @@ def test_Database_pressures__all_args():
         {'pattern': sentinel.pattern, 'variable': sentinel.variable,
          'initial_time':sentinel.initial_time})
     assert pressures == [sentinel.value1, sentinel.value2]
+
+
+def _dump(db):
+    tables = ["file", "variable", "time", "variable_to_time",
+              "pressure", "variable_to_pressure"]
+    return {table: db.connection.execute(
+                "SELECT * FROM {}".format(table)).fetchall()
+            for table in tables}
+
+
+def test_Database_insert_metadata_matches_per_row_inserts():
+    metadata = database.FileMetadata("file.nc", "2019-01-01 00:00:00", [
+        database.VariableMetadata(
+            "air_temperature", 0, 1,
+            ["2019-01-01 00:00:00", "2019-01-01 01:00:00"],
+            [1000., 850.]),
+        database.VariableMetadata(
+            "mslp", 0, None, ["2019-01-01 00:00:00"], [])])
+    expect = database.Database.connect(":memory:")
+    expect.insert_file_name(metadata.path, metadata.reference_time)
+    for variable in metadata.variables:
+        expect.insert_variable(
+            metadata.path,
+            variable.name,
+            time_axis=variable.time_axis,
+            pressure_axis=variable.pressure_axis)
+        expect.insert_times(metadata.path, variable.name, variable.times)
+        expect.insert_pressures(
+            metadata.path, variable.name, variable.pressures)
+    result = database.Database.connect(":memory:")
+    result.insert_metadata(metadata)
+    assert _dump(result) == _dump(expect)
+
+
+def _um_file(path, time_dim, pressure_dim, scalar_time=False):
+    units = "hours since 1970-01-01 00:00:00"
+    with netCDF4.Dataset(path, "w") as dataset:
+        dataset.createDimension("longitude", 2)
+        dataset.createDimension(time_dim, 2)
+        if pressure_dim != time_dim:
+            dataset.createDimension(pressure_dim, 3)
+        obj = dataset.createVariable("longitude", "d", ("longitude",))
+        obj.standard_name = "longitude"
+        obj.units = "degrees_east"
+        obj[:] = [0, 1]
+        obj = dataset.createVariable("forecast_reference_time", "d", ())
+        obj.units = units
+        obj[:] = 0
+        if scalar_time:
+            obj = dataset.createVariable("time", "d", ())
+            obj[:] = 12
+        else:
+            obj = dataset.createVariable("time", "d", (time_dim,))
+            obj[:] = [12, 15]
+        obj.units = units
+        size = len(dataset.dimensions[pressure_dim])
+        obj = dataset.createVariable("pressure", "d", (pressure_dim,))
+        obj[:] = [1000., 850., 500.][:size]
+        dims = [pressure_dim, "longitude"]
+        if (time_dim != pressure_dim) and not scalar_time:
+            dims = [time_dim] + dims
+        obj = dataset.createVariable("air_temperature", "f", dims)
+        obj.coordinates = "forecast_reference_time pressure time"
+        obj = dataset.createVariable("mslp", "f", ("longitude",))
+
+
+@pytest.mark.parametrize("time_dim,pressure_dim,scalar_time", [
+    ("time", "pressure", False),
+    ("dim0", "dim0", False),
+    ("time", "pressure", True),
+])
+def test_netcdf_metadata_matches_iris_metadata(
+        tmpdir, time_dim, pressure_dim, scalar_time):
+    path = str(tmpdir / "file.nc")
+    _um_file(path, time_dim, pressure_dim, scalar_time)
+    result = database.netcdf_metadata(path)
+    expect = database.iris_metadata(path)
+    assert result.reference_time == expect.reference_time
+    assert sorted(result.variables) == sorted(expect.variables)
+
+
+def test_netcdf_metadata_inserts_identical_rows(tmpdir):
+    path = str(tmpdir / "file.nc")
+    _um_file(path, "time", "pressure")
+    result = database.Database.connect(":memory:")
+    result.insert_metadata(database.netcdf_metadata(path))
+    expect = database.Database.connect(":memory:")
+    expect.insert_metadata(database.iris_metadata(path))
+    assert _dump(result) == _dump(expect)
+
+
+def test_extract_metadata_falls_back_to_iris(tmpdir):
+    path = str(tmpdir / "file.nc")
+    with netCDF4.Dataset(path, "w") as dataset:
+        dataset.createDimension("t", 1)
+        obj = dataset.createVariable("t", "d", ("t",))
+        obj.standard_name = "time"
+        obj.units = "hours since 1970-01-01 00:00:00"
+        obj[:] = [0]
+        obj = dataset.createVariable("air_temperature", "f", ("t",))
+    result = database.extract_metadata(path)
+    assert result.variables == [database.VariableMetadata(
+        "air_temperature", 0, None, ["1970-01-01 00:00:00"], [])]
+
+
+def test_Database_delete_file_keeps_other_files():
+    db = database.Database.connect(":memory:")
+    for path in ["a.nc", "b.nc"]:
+        db.insert_times(path, "air_temperature", ["2019-01-01 00:00:00"])
+        db.insert_pressures(path, "air_temperature", [1000.])
+    db.delete_file("a.nc")
+    assert db.files() == ["b.nc"]
+    assert db.valid_times(variable="air_temperature") == [
+        "2019-01-01 00:00:00"]
+    assert db.pressures(variable="air_temperature") == [1000.]
+    assert len(_dump(db)["variable_to_time"]) == 1
+
+
+def test_Database_migrates_existing_schema():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("""
+        CREATE TABLE file (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                reference TEXT,
+                UNIQUE(name))
+    """)
+    connection.execute("INSERT INTO file (name) VALUES ('a.nc')")
+    db = database.Database(connection)
+    assert db.file_stats() == {"a.nc": (None, None)}
+    db.insert_file_stat("a.nc", 1.5, 42)
+    assert db.file_stats() == {"a.nc": (1.5, 42)}
+    version, = connection.execute("PRAGMA user_version").fetchone()
+    assert version == len(database.MIGRATIONS)
@@ -0,0 +1,34 @@
+import forest.db.database as database
+import forest.db.explain as explain
+from forest.db import benchmark
+
+
+def _database(count):
+    db = database.Database.connect(":memory:")
+    for i in range(count):
+        db.insert_metadata(database.FileMetadata(
+            "file_{}.nc".format(i),
+            "2019-01-{:02d} 00:00:00".format(i + 1),
+            [database.VariableMetadata(
+                "air_temperature", 0, 1,
+                ["2019-01-{:02d} 0{}:00:00".format(i + 1, j)
+                 for j in range(3)],
+                [1000., 850.])]))
+    return db
+
+
+def test_explain_given_empty_database():
+    db = database.Database.connect(":memory:")
+    assert explain.explain(db) == []
+
+
+def test_explain_queries_use_indexes():
+    result = explain.explain(_database(10), pattern="file_*.nc")
+    assert len(result) > 0
+    for statement, plan in result:
+        scans = [line for line in plan if line.startswith("SCAN")]
+        assert scans == [], statement
+
+
+def test_benchmark():
+    assert benchmark.benchmark(10, repeat=2) > 0
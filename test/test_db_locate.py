@@ -2,6 +2,7 @@ import unittest
 import sqlite3
 import datetime as dt
 from forest import db
+from forest.db import locate
 from forest.exceptions import SearchFail
 
 
@@ -98,3 +99,50 @@ class TestLocator(unittest.TestCase):
             pattern, variable, initial_time, valid_time, pressure)
         expect = ("file_000.nc", (0, 0))
         self.assertEqual(expect, result)
+
+    def _insert(self, path, variable="mslp"):
+        self.database.insert_file_name(path, "2019-01-01 00:00:00")
+        self.database.insert_variable(path, variable, time_axis=0)
+        self.database.insert_time(path, variable, "2019-01-01 03:00:00", i=0)
+
+    def test_locate_sees_files_indexed_after_first_search(self):
+        args = ("*.nc", "mslp", "2019-01-01 00:00:00", "2019-01-01 03:00:00")
+        with self.assertRaises(SearchFail):
+            self.locator.locate(*args)
+        self._insert("a.nc")
+        self.assertEqual(self.locator.locate(*args), ("a.nc", (0,)))
+
+    def test_locator_cache_size(self):
+        locator = db.Locator(self.connection, cache_size=2)
+        for path in ["a.nc", "b.nc", "c.nc"]:
+            self._insert(path)
+            locator.axes(path, "mslp")
+        self.assertEqual(len(locator._cache), 2)
+
+    def test_locator_caches_are_not_shared(self):
+        self._insert("a.nc")
+        self.locator.axes("a.nc", "mslp")
+        other = db.Locator(self.connection)
+        self.assertEqual(len(other._cache), 0)
+
+    def test_coordinate_fetches_time_and_pressure_together(self):
+        path, variable = "a.nc", "air_temperature"
+        self.database.insert_variable(path, variable, 0, 1)
+        self.database.insert_times(path, variable, ["2019-01-01 00:00:00"])
+        self.database.insert_pressures(path, variable, [1000., 850.])
+        times = self.locator.coordinate(path, variable, "time")
+        pressures = self.locator.coordinate(path, variable, "pressure")
+        self.assertEqual(len(self.locator._cache), 1)
+        self.assertEqual(times.tolist(), [dt.datetime(2019, 1, 1)])
+        self.assertEqual(pressures.tolist(), [1000., 850.])
+
+
+class TestScatter(unittest.TestCase):
+    def test_scatter_parses_times_in_index_order(self):
+        result = locate.scatter(
+            [1, 0],
+            ["2019-01-01 01:00:00", "2019-01-01 00:00:00"],
+            "datetime64[s]")
+        self.assertEqual(result.tolist(), [
+            dt.datetime(2019, 1, 1, 0),
+            dt.datetime(2019, 1, 1, 1)])
@@ -153,3 +153,91 @@ class TestMain(unittest.TestCase):
         result = cursor.fetchall()
         expect = [(0, 0)]
         self.assertEqual(expect, result)
+
+    def test_main_given_jobs_indexes_files_in_parallel(self):
+        paths = ["test_file_{}.nc".format(i) for i in range(3)]
+        self._paths += paths
+        for path in paths:
+            with netCDF4.Dataset(path, "w") as dataset:
+                dataset.createDimension("x", 1)
+                var = dataset.createVariable("x", "f", ("x",))
+                var = dataset.createVariable("air_temperature", "f", ("x",))
+                var.um_stash_source = "m01s16i203"
+
+        main.main([
+            "--database", self.database_file,
+            "--jobs", "2",
+            "--batch-size", "2"] + paths)
+
+        connection = sqlite3.connect(self.database_file)
+        cursor = connection.cursor()
+        cursor.execute("""
+                SELECT file.name, variable.name FROM variable
+                  JOIN file ON file.id = variable.file_id
+                 ORDER BY file.name
+        """)
+        result = cursor.fetchall()
+        expect = [(path, "air_temperature") for path in paths]
+        self.assertEqual(expect, result)
+
+    def _write_file(self, path, variable):
+        with netCDF4.Dataset(path, "w") as dataset:
+            dataset.createDimension("x", 1)
+            dataset.createVariable("x", "f", ("x",))
+            dataset.createVariable(variable, "f", ("x",))
+
+    def _file_variables(self, database):
+        return database.connection.execute("""
+                SELECT file.name, variable.name FROM variable
+                  JOIN file ON file.id = variable.file_id
+                 ORDER BY file.name
+        """).fetchall()
+
+    def test_sync_indexes_new_changed_and_deleted_files(self):
+        paths = ["test_file_{}.nc".format(i) for i in range(3)]
+        self._paths += paths
+        for path in paths[:2]:
+            self._write_file(path, "air_temperature")
+        database = forest.db.Database.connect(":memory:")
+
+        result = main.sync(database, ["test_file_*.nc"])
+        self.assertEqual(result, (paths[:2], []))
+
+        result = main.sync(database, ["test_file_*.nc"])
+        self.assertEqual(result, ([], []))
+
+        os.remove(paths[0])
+        self._write_file(paths[1], "relative_humidity")
+        os.utime(paths[1], (0, 0))
+        self._write_file(paths[2], "air_temperature")
+        result = main.sync(database, ["test_file_*.nc"])
+        self.assertEqual(result, (paths[1:], [paths[0]]))
+        self.assertEqual(self._file_variables(database), [
+            (paths[1], "relative_humidity"),
+            (paths[2], "air_temperature")])
+
+    def test_main_records_file_mtime_and_size(self):
+        self._write_file(self.netcdf_file, "air_temperature")
+        main.main([
+            "--database", self.database_file,
+            self.netcdf_file
+        ])
+        with forest.db.Database.connect(self.database_file) as database:
+            result = database.file_stats()
+        self.assertEqual(result, {
+            self.netcdf_file: main.stat(self.netcdf_file)})
+
+    def test_watch_syncs_until_interrupted(self):
+        self._write_file(self.netcdf_file, "air_temperature")
+        database = forest.db.Database.connect(":memory:")
+        calls = []
+
+        def sleep(interval):
+            calls.append(interval)
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            main.watch(database, [self.netcdf_file], interval=5, sleep=sleep)
+        self.assertEqual(calls, [5])
+        self.assertEqual(self._file_variables(database), [
+            (self.netcdf_file, "air_temperature")])
@@ -142,6 +142,25 @@ class TestLocator(unittest.TestCase):
                     valid_time,
                     pressure)
 
+    def test_locator_reads_axes_once(self):
+        reference_time = dt.datetime(2019, 1, 1)
+        times = [dt.datetime(2019, 1, 2), dt.datetime(2019, 1, 2, 3)]
+        with netCDF4.Dataset(self.path, "w") as dataset:
+            um = tutorial.UM(dataset)
+            dataset.createDimension("longitude", 1)
+            dataset.createDimension("latitude", 1)
+            var = um.times("time", length=len(times))
+            var[:] = netCDF4.date2num(times, units=var.units)
+            um.forecast_reference_time(reference_time)
+            dims = ("time", "longitude", "latitude")
+            var = um.relative_humidity(dims, coordinates="")
+            var[:] = 100.
+        locator = unified_model.Locator([self.path])
+        args = (self.path, "relative_humidity", reference_time)
+        self.assertEqual(locator.locate(*args, times[0]), (self.path, (0,)))
+        os.remove(self.path)
+        self.assertEqual(locator.locate(*args, times[1]), (self.path, (1,)))
+
     def test_initial_time_given_forecast_reference_time(self):
         time = dt.datetime(2019, 1, 1, 12)
         with netCDF4.Dataset(self.path, "w") as dataset:
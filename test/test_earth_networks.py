@@ -1,6 +1,9 @@
 import datetime as dt
 import glob
-from forest import earth_networks
+import os
+import unittest.mock
+from forest import earth_networks, geo, db, pyramid
+import numpy as np
 import pandas as pd
 import pandas.testing as pdt
 
@@ -31,3 +34,120 @@ def test_earth_networks(tmpdir):
         ],
         name=0)
     pdt.assert_series_equal(expect, result)
+
+
+def test_store_window_is_sorted_and_half_open():
+    store = earth_networks.Store({
+        "date": np.array([
+            "2019-04-17T00:20",
+            "2019-04-17T00:05",
+            "2019-04-17T00:15",
+            "2019-04-17T00:00"], dtype="datetime64[ns]"),
+        "flash_type": np.array(["CG", "IC", "CG", "IC"], dtype=object),
+        "latitude": np.zeros(4),
+        "longitude": np.array([20., 5., 15., 0.])})
+    result = store.window(
+            dt.datetime(2019, 4, 17, 0, 0),
+            dt.datetime(2019, 4, 17, 0, 15))
+    np.testing.assert_array_equal(result["longitude"], [0., 5.])
+    np.testing.assert_array_almost_equal(
+            result["x"],
+            geo.web_mercator([0., 5.], [0., 0.])[0])
+
+
+def test_view_load_returns_projected_window(tmpdir):
+    path = str(tmpdir / "sample.txt")
+    with open(path, "w") as stream:
+        stream.write("\n".join(LINES))
+    view = earth_networks.View(earth_networks.Loader([path]))
+    points, image = view.load(db.State(valid_time="2019-04-17 00:00:00"))
+    assert len(points["x"]) == 2
+    np.testing.assert_array_equal(points["date"], np.sort(points["date"]))
+    view.update((points, image))
+    assert len(view.source.data["flash_type"]) == 2
+    assert len(view.image_source.data["image"]) == 0
+
+
+def test_loader_given_no_files():
+    loader = earth_networks.Loader([])
+    frame = loader.load_date(dt.datetime(2019, 4, 17))
+    assert len(frame) == 0
+
+
+def write_csv(path, lines):
+    with open(path, "w") as stream:
+        stream.write("\n".join(lines) + "\n")
+
+
+def test_archive_converts_each_file_once(tmpdir):
+    path = str(tmpdir / "sample.txt")
+    write_csv(path, LINES)
+    pattern = str(tmpdir / "*.txt")
+    archive = earth_networks.Archive(pattern)
+    assert os.path.exists(earth_networks.cache_path(path))
+    with unittest.mock.patch("forest.earth_networks.read_csv") as read_csv:
+        archive = earth_networks.Archive(pattern)
+        result = archive.window(
+                dt.datetime(2019, 4, 17),
+                dt.datetime(2019, 4, 17, 0, 15))
+    read_csv.assert_not_called()
+    assert list(result["flash_type"]) == ["IC", "IC"]
+    np.testing.assert_array_equal(result["latitude"], [2.63884, 2.75144])
+
+
+def test_archive_picks_up_new_files(tmpdir):
+    write_csv(str(tmpdir / "a.txt"), LINES)
+    archive = earth_networks.Archive(str(tmpdir / "*.txt"), interval=0)
+    write_csv(str(tmpdir / "b.txt"), [
+        "0,20190417T000000.500,+01.0,+030.0,-000001778,000,15635,007,001"])
+    with unittest.mock.patch("forest.earth_networks.read_csv",
+                             wraps=earth_networks.read_csv) as read_csv:
+        result = archive.window(
+                dt.datetime(2019, 4, 17),
+                dt.datetime(2019, 4, 17, 0, 15))
+    read_csv.assert_called_once_with(str(tmpdir / "b.txt"))
+    assert list(result["flash_type"]) == ["CG", "IC", "IC"]
+    np.testing.assert_array_equal(result["date"], np.sort(result["date"]))
+
+
+def test_archive_skips_files_outside_window(tmpdir):
+    write_csv(str(tmpdir / "a.txt"), LINES)
+    archive = earth_networks.Archive(str(tmpdir / "*.txt"), cache_size=0)
+    with unittest.mock.patch.object(archive, "_load") as load:
+        result = archive.window(
+                dt.datetime(2019, 4, 18),
+                dt.datetime(2019, 4, 18, 0, 15))
+    load.assert_not_called()
+    assert len(result["x"]) == 0
+
+
+def flashes(x, y):
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    return {
+        "x": x,
+        "y": y,
+        "date": np.zeros(len(x), dtype="datetime64[ns]"),
+        "longitude": x,
+        "latitude": y,
+        "flash_type": np.array(["CG"] * len(x), dtype=object)}
+
+
+def test_view_bin_draws_circles_inside_viewport():
+    view = earth_networks.View(earth_networks.Loader([]), max_flashes=2)
+    view.viewport = pyramid.Viewport(0, 10, 0, 10, 100, 100)
+    points, image = view.bin(flashes([1, 5, 20], [1, 5, 5]))
+    np.testing.assert_array_equal(points["x"], [1, 5])
+    assert image["image"] == []
+
+
+def test_view_bin_given_many_flashes_returns_density():
+    view = earth_networks.View(earth_networks.Loader([]), max_flashes=2)
+    view.viewport = pyramid.Viewport(0, 10, 0, 20, 8, 16)
+    points, image = view.bin(flashes([1, 1, 6, 20], [1, 1, 15, 5]))
+    assert points["x"] == []
+    counts = image["image"][0]
+    assert counts.shape == (4, 2)
+    assert counts[0, 0] == 2
+    assert counts[3, 1] == 1
+    assert np.isnan(counts[0, 1])
+    assert (image["dw"], image["dh"]) == ([10], [20])
@@ -1,8 +1,10 @@
 import pytest
+import os
+import unittest.mock
 import datetime as dt
 import netCDF4
 import numpy as np
-from forest import (eida50, satellite, navigate)
+from forest import (eida50, satellite, navigate, handles)
 from forest.exceptions import FileNotFound, IndexNotFound
 
 
@@ -224,3 +226,64 @@ def test_navigator_pressures(tmpdir):
     result = navigator.pressures(path, variable, TIMES[0])
     expect = []
     np.testing.assert_array_equal(expect, result)
+
+
+def test_locator_index_rebuilt_only_when_directory_changes(tmpdir):
+    pattern = str(tmpdir / "test-eida50*.nc")
+    for date in [dt.datetime(2019, 1, 3), dt.datetime(2019, 1, 1)]:
+        path = str(tmpdir / "test-eida50-{:%Y%m%d}.nc".format(date))
+        with netCDF4.Dataset(path, "w") as dataset:
+            set_times(dataset, [date])
+    locator = satellite.Locator(pattern)
+    paths, dates = locator.index()
+    np.testing.assert_array_equal(dates, np.array(
+        ["2019-01-01", "2019-01-03"], dtype="datetime64[s]"))
+    with unittest.mock.patch("forest.satellite.glob.glob") as glob:
+        locator.index()
+    glob.assert_not_called()
+
+    path = str(tmpdir / "test-eida50-20190102.nc")
+    with netCDF4.Dataset(path, "w") as dataset:
+        set_times(dataset, [dt.datetime(2019, 1, 2)])
+    os.utime(str(tmpdir), ns=(0, 10**18))
+    found_path, _ = locator.find(dt.datetime(2019, 1, 2, 0, 5))
+    assert found_path == path
+
+
+def test_locator_find_given_date_before_first_file(tmpdir):
+    path = str(tmpdir / "test-eida50-20190102.nc")
+    with netCDF4.Dataset(path, "w") as dataset:
+        set_times(dataset, [dt.datetime(2019, 1, 2)])
+    locator = satellite.Locator(str(tmpdir / "test-eida50*.nc"))
+    with pytest.raises(FileNotFound):
+        locator.find(dt.datetime(2019, 1, 1))
+
+
+def test_loader_image_reuses_open_file(tmpdir):
+    path = str(tmpdir / "file_20190417.nc")
+    with netCDF4.Dataset(path, "w") as dataset:
+        _eida50(dataset, TIMES, LONS, LATS)
+    pool = handles.DatasetPool()
+    loader = satellite.EIDA50(path, pool=pool)
+    for time in TIMES[:4]:
+        image = loader.image(time)
+    assert pool.opened == 1
+    assert image["image"][0].shape == (22, 45)
+    pool.close()
+
+
+def test_coarsen_ignores_masked_and_nan_pixels():
+    values = np.ma.masked_array(
+            [[1., 3., 5., np.nan],
+             [np.nan, 2., 7., np.nan]],
+            mask=[[False, False, False, False],
+                  [False, True, False, False]])
+    result = satellite.coarsen(values, 2)
+    np.testing.assert_array_almost_equal(result, [[2., 6.]])
+    values[:, :2] = np.ma.masked
+    assert satellite.coarsen(values, 2).mask.tolist() == [[True, False]]
+
+
+def test_coarsen_axis():
+    result = satellite.coarsen_axis(np.arange(10.), 4)
+    np.testing.assert_array_almost_equal(result, [1.5, 5.5])
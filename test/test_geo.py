@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+from forest import geo
+
+
+def stretch_image_reference(lons, lats, values):
+    """Resample using geo.stretch_y and scipy.ndimage"""
+    _, gy = geo.web_mercator(np.zeros(len(lats)), lats)
+    return geo.stretch_y(gy)(values)
+
+
+@pytest.mark.parametrize("lats", [
+    np.linspace(-23.5, 23.5, 90),
+    np.linspace(-80, 80, 181),
+    np.linspace(10, 60, 7, dtype="f"),
+    np.linspace(23.5, -23.5, 90),
+    np.linspace(60, 10, 7),
+])
+def test_stretch_image_matches_stretch_y(lats):
+    lons = np.linspace(90, 140, 50)
+    values = np.random.RandomState(0).randn(len(lats), len(lons))
+    result = geo.stretch_image(lons, lats, values)["image"][0]
+    expect = stretch_image_reference(lons, lats, values)
+    np.testing.assert_allclose(result, expect, atol=1e-6)
+
+
+def test_stretch_image_preserves_float32():
+    lons = np.linspace(0, 10, 5)
+    lats = np.linspace(0, 60, 10)
+    values = np.zeros((10, 5), dtype="f")
+    image = geo.stretch_image(lons, lats, values)["image"][0]
+    assert image.dtype == np.float32
+
+
+def test_stretch_image_masks_pixels_next_to_masked_values():
+    lons = np.linspace(0, 10, 3)
+    lats = np.linspace(0, 60, 5)
+    values = np.ma.masked_array(
+            np.ones((5, 3)), mask=np.zeros((5, 3), dtype=bool))
+    values.data[2] = 1e36  # Fill value
+    values.mask[2] = True
+    image = geo.stretch_image(lons, lats, values)["image"][0]
+    assert image.mask[2].all()
+    np.testing.assert_allclose(image.compressed(), 1.)
+
+
+def test_stretch_image_extent():
+    lons = np.linspace(0, 10, 3)
+    lats = np.linspace(0, 60, 5)
+    result = geo.stretch_image(lons, lats, np.zeros((5, 3)))
+    gx, _ = geo.web_mercator(lons, np.zeros(3))
+    _, gy = geo.web_mercator(np.zeros(5), lats)
+    assert result["x"] == [gx[0]]
+    assert result["y"] == [gy[0]]
+    np.testing.assert_allclose(result["dw"], [gx[-1] - gx[0]])
+    np.testing.assert_allclose(result["dh"], [gy[-1] - gy[0]])
+
+
+def test_mercator_grid_cached_per_grid():
+    lons = np.linspace(0, 10, 3)
+    lats = np.linspace(0, 60, 5)
+    assert geo.mercator_grid(lons, lats) is geo.mercator_grid(lons.copy(), lats)
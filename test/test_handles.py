@@ -0,0 +1,63 @@
+import os
+import pytest
+import netCDF4
+from forest import handles
+
+
+def write(path, value):
+    with netCDF4.Dataset(path, "w") as dataset:
+        dataset.createDimension("x", 1)
+        var = dataset.createVariable("x", "f", ("x",))
+        var[:] = value
+
+
+@pytest.fixture
+def paths(tmpdir):
+    paths = [str(tmpdir / "file_{}.nc".format(i)) for i in range(3)]
+    for i, path in enumerate(paths):
+        write(path, i)
+    return paths
+
+
+def test_pool_reuses_open_dataset(paths):
+    pool = handles.DatasetPool(max_size=2)
+    for _ in range(3):
+        with pool.dataset(paths[0]) as dataset:
+            assert dataset.variables["x"][0] == 0
+    assert pool.opened == 1
+
+
+def test_pool_closes_least_recently_used(paths):
+    pool = handles.DatasetPool(max_size=2)
+    with pool.dataset(paths[0]) as first:
+        pass
+    for path in paths[1:]:
+        with pool.dataset(path):
+            pass
+    assert len(pool) == 2
+    assert not first.isopen()
+    with pool.dataset(paths[0]):
+        pass
+    assert pool.opened == 4
+
+
+def test_pool_reopens_modified_file(paths):
+    pool = handles.DatasetPool()
+    with pool.dataset(paths[0]) as first:
+        pass
+    tmp = paths[0] + ".tmp"
+    write(tmp, 42)
+    os.utime(tmp, (0, 10**9))
+    os.replace(tmp, paths[0])
+    with pool.dataset(paths[0]) as dataset:
+        assert dataset.variables["x"][0] == 42
+    assert not first.isopen()
+
+
+def test_pool_close(paths):
+    pool = handles.DatasetPool()
+    with pool.dataset(paths[0]) as dataset:
+        pass
+    pool.close()
+    assert len(pool) == 0
+    assert not dataset.isopen()
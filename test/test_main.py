@@ -2,6 +2,7 @@ import os
 import yaml
 import sqlite3
 import pytest
+from concurrent.futures import Future
 import forest
 from forest import main
 
@@ -39,3 +40,136 @@ def test_file_groups_given_config_file(tmpdir):
             directory=directory,
             locator="database")
     assert actual == expected
+
+
+class FakeViewer(object):
+    def __init__(self):
+        self.rendered = []
+        self.updated = []
+
+    def render(self, state):
+        self.rendered.append(state)
+
+    def load(self, state):
+        return "data: {}".format(state)
+
+    def update(self, data):
+        self.updated.append(data)
+
+
+class FakeDocument(object):
+    def __init__(self):
+        self.callbacks = []
+
+    def add_next_tick_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def tick(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+class QueueExecutor(object):
+    """Executor that runs tasks when told to"""
+    def __init__(self):
+        self.tasks = []
+
+    def submit(self, f, *args):
+        future = Future()
+        self.tasks.append((future, f, args))
+        return future
+
+    def run(self):
+        tasks, self.tasks = self.tasks, []
+        for future, f, args in tasks:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(f(*args))
+                except Exception as e:
+                    future.set_exception(e)
+
+
+def test_artist_renders_synchronously_by_default():
+    viewer = FakeViewer()
+    artist = main.Artist({"A": viewer}, {"A": []})
+    artist.visible_state = {"A": [True]}
+    artist.on_state("state")
+    assert viewer.rendered == ["state"]
+
+
+def test_artist_updates_document_on_next_tick():
+    viewer = FakeViewer()
+    executor, document = QueueExecutor(), FakeDocument()
+    artist = main.Artist({"A": viewer}, {"A": []},
+                         executor=executor, document=document)
+    artist.visible_state = {"A": [True]}
+    artist.on_state("state")
+    executor.run()
+    assert viewer.updated == []
+    document.tick()
+    assert viewer.rendered == []
+    assert viewer.updated == ["data: state"]
+
+
+def test_artist_discards_superseded_loads():
+    viewer = FakeViewer()
+    executor, document = QueueExecutor(), FakeDocument()
+    artist = main.Artist({"A": viewer}, {"A": []},
+                         executor=executor, document=document)
+    artist.visible_state = {"A": [True]}
+    artist.on_state("old")
+    artist.on_state("new")
+    executor.run()
+    document.tick()
+    assert viewer.updated == ["data: new"]
+
+
+def test_artist_discards_loads_superseded_before_next_tick():
+    viewer = FakeViewer()
+    executor, document = QueueExecutor(), FakeDocument()
+    artist = main.Artist({"A": viewer}, {"A": []},
+                         executor=executor, document=document)
+    artist.visible_state = {"A": [True]}
+    artist.on_state("old")
+    executor.run()
+    artist.on_state("new")
+    executor.run()
+    document.tick()
+    assert viewer.updated == ["data: new"]
+
+
+class FakeZoomableViewer(FakeViewer):
+    zoomable = True
+    viewport = None
+
+
+def test_artist_on_viewport_renders_zoomable_viewers():
+    zoomable, fixed = FakeZoomableViewer(), FakeViewer()
+    artist = main.Artist({"A": zoomable, "B": fixed}, {"A": [], "B": []})
+    artist.visible_state = {"A": [True], "B": [True]}
+    artist.state = "state"
+    artist.on_viewport("viewport")
+    assert zoomable.viewport == "viewport"
+    assert zoomable.rendered == ["state"]
+    assert fixed.rendered == []
+
+
+class FailingViewer(FakeViewer):
+    empty = "empty"
+
+    def load(self, state):
+        raise IOError("disk error")
+
+
+def test_artist_clears_layer_and_reraises_failed_loads():
+    viewer = FailingViewer()
+    executor, document = QueueExecutor(), FakeDocument()
+    artist = main.Artist({"A": viewer}, {"A": []},
+                         executor=executor, document=document)
+    artist.visible_state = {"A": [True]}
+    artist.on_state("state")
+    executor.run()
+    with pytest.raises(IOError):
+        document.tick()
+    assert viewer.updated == ["empty"]
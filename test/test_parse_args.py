@@ -19,7 +19,18 @@ def test_no_files_or_config_raises_system_exit():
     (["--var", "key", "value", "file.nc"], "variables", [["key", "value"]]),
     (["--var", "a", "b:c", "file.nc"], "variables", [["a", "b:c"]]),
     (["--var", "a", "b",
-      "--var", "c", "d", "file.nc"], "variables", [["a", "b"], ["c", "d"]])
+      "--var", "c", "d", "file.nc"], "variables", [["a", "b"], ["c", "d"]]),
+    (["file.nc"], "image_cache_mb", None),
+    (["--image-cache-mb", "512", "file.nc"], "image_cache_mb", 512.),
+    (["file.nc"], "prefetch", 0),
+    (["--prefetch", "2", "file.nc"], "prefetch", 2),
+    (["file.nc"], "render_workers", 0),
+    (["--render-workers", "4", "file.nc"], "render_workers", 4),
+    (["file.nc"], "quantise", None),
+    (["--quantise", "8", "file.nc"], "quantise", 8),
+    (["file.nc"], "coordinate_cache", None),
+    (["--coordinate-cache", "menus.db", "file.nc"],
+     "coordinate_cache", "menus.db")
 ])
 def test_parse_args(argv, attr, expect):
     result = getattr(parse_args(argv), attr)
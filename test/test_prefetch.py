@@ -0,0 +1,123 @@
+import pytest
+import threading
+from concurrent.futures import Future
+from forest import data, db, redux
+from forest.cache import LRUCache
+from forest.prefetch import Prefetch, neighbours, nearest_neighbours
+
+
+class Immediate(object):
+    """Executor that runs tasks on the calling thread"""
+    def submit(self, f, *args):
+        future = Future()
+        future.set_result(f(*args))
+        return future
+
+
+class FakeLocator(object):
+    def locate(self, pattern, variable, initial_time, valid_time, pressure):
+        return "file.nc", (valid_time, pressure)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    def load_pyramid(path, variable, pts_3d, pts_4d):
+        calls.append((path, variable, pts_3d))
+    monkeypatch.setattr(data, "load_pyramid", load_pyramid)
+    return calls
+
+
+@pytest.mark.parametrize("items,item,steps,expect", [
+    ([1, 2, 3, 4, 5], 3, 1, [4, 2]),
+    ([1, 2, 3, 4, 5], 3, 2, [4, 2, 5, 1]),
+    ([1, 2, 3], 1, 2, [2, 3]),
+    ([3, 1, 2], 3, 1, [2]),
+    ([1, 2, 3], 4, 1, []),
+    (["2019-01-01 03:00:00", "2019-01-01 00:00:00"],
+     "2019-01-01 00:00:00", 1, ["2019-01-01 03:00:00"]),
+])
+def test_neighbours(items, item, steps, expect):
+    assert neighbours(items, item, steps) == expect
+
+
+def test_nearest_neighbours_given_inexact_pressure():
+    assert nearest_neighbours([1000., 850., 500.], 850.001, 1) == [1000., 500.]
+
+
+def test_prefetch_loads_neighbouring_valid_times_and_pressures(calls):
+    loader = data.DBLoader("UM", "*.nc", FakeLocator())
+    prefetch = Prefetch({"UM": loader}, steps=1, executor=Immediate())
+    prefetch.prefetch({
+        "variable": "air_temperature",
+        "initial_time": "2019-01-01 00:00:00",
+        "valid_time": "2019-01-01 03:00:00",
+        "valid_times": [
+            "2019-01-01 00:00:00",
+            "2019-01-01 03:00:00",
+            "2019-01-01 06:00:00"],
+        "pressure": 850.,
+        "pressures": [1000., 850., 500.]})
+    assert calls == [
+        ("file.nc", "air_temperature", ("2019-01-01 06:00:00", 850.)),
+        ("file.nc", "air_temperature", ("2019-01-01 00:00:00", 850.)),
+        ("file.nc", "air_temperature", ("2019-01-01 03:00:00", 1000.)),
+        ("file.nc", "air_temperature", ("2019-01-01 03:00:00", 500.)),
+    ]
+
+
+def test_prefetch_skips_hidden_layers(calls):
+    loader = data.DBLoader("UM", "*.nc", FakeLocator())
+    prefetch = Prefetch({"UM": loader}, executor=Immediate())
+    prefetch.on_visible({"UM": [False, False, False]})
+    prefetch.prefetch({
+        "variable": "air_temperature",
+        "initial_time": "2019-01-01 00:00:00",
+        "valid_time": "2019-01-01 00:00:00",
+        "valid_times": ["2019-01-01 00:00:00", "2019-01-01 03:00:00"],
+        "pressures": []})
+    assert calls == []
+
+
+def test_prefetch_middleware_reacts_to_set_valid_time(calls):
+    loader = data.DBLoader("UM", "*.nc", FakeLocator())
+    prefetch = Prefetch({"UM": loader}, executor=Immediate())
+    store = redux.Store(
+        db.reducer,
+        initial_state={
+            "variable": "air_temperature",
+            "initial_time": "2019-01-01 00:00:00",
+            "valid_times": ["2019-01-01 00:00:00", "2019-01-01 03:00:00"],
+            "pressures": []},
+        middlewares=[prefetch])
+    store.dispatch(db.set_value("valid_time", "2019-01-01 00:00:00"))
+    assert calls == [
+        ("file.nc", "air_temperature", ("2019-01-01 03:00:00", None))]
+
+
+def test_load_pyramid_waits_for_load_in_progress(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    def _load_pyramid(path, variable, pts_3d, pts_4d):
+        calls.append(path)
+        started.set()
+        release.wait(timeout=5)
+        return "pyramid"
+    monkeypatch.setattr(data, "_load_pyramid", _load_pyramid)
+    monkeypatch.setattr(data, "IMAGES", LRUCache())
+    results = []
+    worker = threading.Thread(
+            target=lambda: results.append(
+                data.load_pyramid("file.nc", "v", (0,), (0,))))
+    worker.start()
+    started.wait(timeout=5)
+    foreground = threading.Thread(
+            target=lambda: results.append(
+                data.load_pyramid("file.nc", "v", (0,), (0,))))
+    foreground.start()
+    release.set()
+    worker.join()
+    foreground.join()
+    assert calls == ["file.nc"]
+    assert results == ["pyramid", "pyramid"]
+    assert data.PENDING == {}
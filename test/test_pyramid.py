@@ -0,0 +1,132 @@
+import pytest
+import numpy as np
+import numpy.testing as npt
+from forest import pyramid, geo
+from forest.cache import nbytes
+
+
+def make_pyramid(nx, ny, min_size=4):
+    values = np.arange(nx * ny, dtype="f").reshape(ny, nx)
+    return pyramid.Pyramid({
+        "x": [0.],
+        "y": [0.],
+        "dw": [float(nx)],
+        "dh": [float(ny)],
+        "image": [values]}, min_size=min_size)
+
+
+def test_block_mean():
+    values = np.array([
+        [0, 1, 2, 3],
+        [4, 5, 6, 7]], dtype="f")
+    npt.assert_array_equal(pyramid.block_mean(values), [[2.5, 4.5]])
+
+
+def test_block_mean_drops_odd_row_and_column():
+    values = np.ones((5, 3))
+    assert pyramid.block_mean(values).shape == (2, 1)
+
+
+def test_block_mean_ignores_masked_pixels():
+    values = np.ma.masked_array(
+            [[1, 2], [3, 4]],
+            mask=[[True, False], [False, False]], dtype="f")
+    npt.assert_array_equal(pyramid.block_mean(values), [[3]])
+
+
+def test_block_mean_masks_blocks_of_nan():
+    values = np.full((2, 2), np.nan)
+    assert pyramid.block_mean(values).mask.all()
+
+
+def test_pyramid_levels():
+    result = make_pyramid(32, 16)
+    shapes = [level[-1].shape for level in result.levels]
+    assert shapes == [(16, 32), (8, 16), (4, 8)]
+
+
+def test_pyramid_levels_preserve_extent():
+    result = make_pyramid(33, 17)
+    for i, (x, y, dw, dh, values) in enumerate(result.levels):
+        ny, nx = values.shape
+        assert dw / nx == 2**i
+        assert dh / ny == 2**i
+
+
+def test_pyramid_nbytes():
+    result = make_pyramid(32, 16)
+    assert nbytes(result) == result.nbytes > 32 * 16 * 4
+
+
+@pytest.mark.parametrize("width,expect", [
+    (4, 2),
+    (8, 2),
+    (9, 1),
+    (16, 1),
+    (32, 0),
+    (1000, 0),
+])
+def test_pyramid_select(width, expect):
+    result = make_pyramid(32, 16)
+    viewport = pyramid.Viewport(0, 32, 0, 16, width, 1)
+    assert result.select(viewport) == expect
+
+
+def test_pyramid_select_zoomed_in_uses_finer_level():
+    result = make_pyramid(32, 16)
+    viewport = pyramid.Viewport(0, 8, 0, 4, 8, 4)
+    assert result.select(viewport) == 0
+
+
+def test_pyramid_image_crops_to_viewport_with_margin():
+    result = make_pyramid(32, 16)
+    viewport = pyramid.Viewport(8, 16, 4, 8, 8, 4)
+    image = result.image(viewport)
+    assert image["x"] == [4]
+    assert image["y"] == [2]
+    assert image["dw"] == [16]
+    assert image["dh"] == [8]
+    npt.assert_array_equal(
+            image["image"][0],
+            result.levels[0][-1][2:10, 4:20])
+
+
+def test_pyramid_image_outside_extent_returns_coarsest_level():
+    result = make_pyramid(32, 16)
+    viewport = pyramid.Viewport(100, 200, 100, 200, 8, 4)
+    image = result.image(viewport)
+    assert image["image"][0].shape == (4, 8)
+    assert image["dw"] == [32]
+
+
+def test_pyramid_image_without_viewport_is_full_extent():
+    result = make_pyramid(32, 16)
+    image = result.image()
+    assert image["x"] == [0]
+    assert image["dw"] == [32]
+    assert image["image"][0].shape == (16, 32)
+
+
+def test_pyramid_image_without_viewport_matches_quarter_resolution():
+    result = make_pyramid(800, 400)
+    image = result.image()
+    assert image["image"][0].shape == (100, 200)
+    assert image["dw"] == [800]
+
+
+def test_pyramid_stores_single_precision():
+    result = pyramid.Pyramid({
+        "x": [0.], "y": [0.], "dw": [1.], "dh": [1.],
+        "image": [np.zeros((4, 4))]})
+    assert result.levels[0][-1].dtype == np.float32
+
+
+def test_pyramid_select_given_viewport_matching_stretched_extent():
+    lons = np.linspace(90, 140, 400)
+    lats = np.linspace(-23.5, 23.5, 200)
+    image = geo.stretch_image(lons, lats, np.zeros((200, 400)))
+    result = pyramid.Pyramid(image, min_size=4)
+    x, y = image["x"][0], image["y"][0]
+    dw, dh = image["dw"][0], image["dh"][0]
+    viewport = pyramid.Viewport(x, x + dw, y, y + dh, 200, 100)
+    assert result.select(viewport) == 1
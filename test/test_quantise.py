@@ -0,0 +1,94 @@
+import pytest
+import numpy as np
+import numpy.testing as npt
+import bokeh.models
+import bokeh.colors
+from forest import quantise, view
+
+
+@pytest.fixture
+def color_mapper():
+    return bokeh.models.LinearColorMapper(
+            low=0, high=253, palette=bokeh.palettes.Plasma[256])
+
+
+def decode(codes, offset, scale):
+    return offset + scale * codes.astype("d")
+
+
+def test_quantise_round_trip(color_mapper):
+    quantiser = quantise.Quantiser(color_mapper, bits=16)
+    color_mapper.high = 1
+    values = np.linspace(0, 1, 11)
+    codes, offset, scale = quantiser.quantise(values)
+    assert codes.dtype == np.uint16
+    npt.assert_allclose(decode(codes, offset, scale), values, atol=scale)
+
+
+def test_quantise_8_bit_codes(color_mapper):
+    quantiser = quantise.Quantiser(color_mapper, bits=8)
+    codes, offset, scale = quantiser.quantise(np.array([0., 1., 253.]))
+    assert codes.dtype == np.uint8
+    npt.assert_array_equal(codes, [1, 2, 254])
+    assert (offset, scale) == (-1, 1)
+
+
+def test_quantise_masked_and_nan_values(color_mapper):
+    quantiser = quantise.Quantiser(color_mapper)
+    values = np.ma.masked_array([np.nan, 1, 2], mask=[False, True, False])
+    codes, _, _ = quantiser.quantise(values)
+    npt.assert_array_equal(codes, [0, 0, 3])
+
+
+def test_quantise_values_outside_limits(color_mapper):
+    quantiser = quantise.Quantiser(color_mapper)
+    codes, _, _ = quantiser.quantise(np.array([-10., 300.]))
+    npt.assert_array_equal(codes, [1, 255])
+
+
+def test_quantise_invisible_min(color_mapper):
+    color_mapper.low_color = bokeh.colors.RGB(0, 0, 0, a=0)
+    quantiser = quantise.Quantiser(color_mapper)
+    codes, _, _ = quantiser.quantise(np.array([-10., 0.]))
+    npt.assert_array_equal(codes, [0, 1])
+
+
+def test_quantise_without_limits_follows_data():
+    color_mapper = bokeh.models.LinearColorMapper(palette=["black"])
+    quantiser = quantise.Quantiser(color_mapper)
+    codes, _, _ = quantiser.quantise(np.array([10., 20.]))
+    npt.assert_array_equal(codes, [1, 254])
+
+
+def test_encode_adds_columns(color_mapper):
+    quantiser = quantise.Quantiser(color_mapper)
+    result = quantiser.encode({
+        "x": [0],
+        "image": [np.array([[np.nan, 1.], [2., 3.]])]})
+    assert result["x"] == [0]
+    assert result["offset"] == [-1]
+    assert result["scale"] == [1]
+    assert result["min"] == [1]
+    assert result["max"] == [3]
+
+
+def test_encode_empty_image(color_mapper):
+    quantiser = quantise.Quantiser(color_mapper)
+    result = quantiser.encode({"image": []})
+    assert result == {
+        "image": [], "offset": [], "scale": [], "min": [], "max": []}
+
+
+def test_quantiser_follows_palette(color_mapper):
+    quantiser = quantise.Quantiser(color_mapper)
+    color_mapper.palette = ["red", "blue"]
+    assert quantiser.coded_mapper.palette == ["red", "blue"]
+
+
+def test_umview_requantises_when_limits_change(color_mapper):
+    quantiser = quantise.Quantiser(color_mapper)
+    viewer = view.UMView(None, color_mapper, quantiser)
+    viewer.update({"image": [np.array([[10.]])]})
+    assert viewer.source.data["image"][0][0, 0] == 11
+    color_mapper.low = 10
+    assert viewer.source.data["image"][0][0, 0] == 1
@@ -1,4 +1,5 @@
 import unittest
+import unittest.mock
 import datetime as dt
 import os
 import glob
@@ -55,3 +56,74 @@ class TestLocator(unittest.TestCase):
         result = locate.in_bounds(bounds, time)
         expect = [False]
         np.testing.assert_array_equal(expect, result)
+
+
+class TestLoader(unittest.TestCase):
+    def setUp(self):
+        self.pattern = os.path.join(os.path.dirname(__file__),
+                "sample/RDT*.json")
+        self.path = glob.glob(self.pattern)[0]
+
+    def test_load_date_decodes_file_once(self):
+        loader = rdt.Loader(self.pattern)
+        date = dt.datetime(2019, 4, 17, 12, 59)
+        with unittest.mock.patch("forest.rdt.parse",
+                                 wraps=rdt.parse) as parse:
+            first = loader.load_date(date)
+            second = loader.load_date(date)
+        parse.assert_called_once_with(self.path)
+        self.assertIs(first, second)
+
+    def test_parse_columns_have_equal_lengths(self):
+        _, tail_lines, tail_points, centre_points = rdt.parse(self.path)
+        for columns in (tail_lines, tail_points, centre_points):
+            sizes = {len(values) for values in columns.values()}
+            self.assertEqual(len(sizes), 1)
+
+    def test_parse_projects_polygons(self):
+        with open(self.path) as stream:
+            feature = json.load(stream)["features"][0]
+        lons, lats = np.asarray(feature["geometry"]["coordinates"][0]).T
+        x, y = rdt.geo.web_mercator(lons, lats)
+        geojson = json.loads(rdt.parse(self.path)[0])
+        result = geojson["features"][0]["geometry"]["coordinates"][0]
+        np.testing.assert_array_almost_equal(np.array([x, y]).T, result)
+
+    def test_parse_centre_lines_join_centre_and_future_points(self):
+        centre_points = rdt.parse(self.path)[3]
+        for x1, x2, xs in zip(centre_points["x1"],
+                              centre_points["x2"],
+                              centre_points["xs"]):
+            self.assertEqual(xs, [x1, x2])
+
+
+def test_calc_dst_point_given_arrays_matches_scalars():
+    lons, lats = np.array([10., -30.]), np.array([5., 60.])
+    speeds, angles = np.array([12.3, 0.]), np.array([45., 270.])
+    x, y = rdt.calc_dst_point(lons, lats, speeds, angles)
+    for i in range(2):
+        expect = rdt.calc_dst_point(lons[i], lats[i], speeds[i], angles[i])
+        np.testing.assert_array_almost_equal(expect, (x[i], y[i]))
+
+
+def test_get_arrow_poly_given_arrays_matches_scalars():
+    lons, lats = np.array([10., 100.]), np.array([5., -20.])
+    speeds, angles = np.array([12.3, 50.]), np.array([45., 359.])
+    result = rdt.get_arrow_poly(lons, lats, speeds, angles)
+    for i in range(2):
+        expect = rdt.get_arrow_poly(lons[i], lats[i], speeds[i], angles[i])
+        np.testing.assert_array_almost_equal(
+                expect, [values[i] for values in result])
+
+
+def test_descale_converts_numbers_only():
+    result = rdt.descale("BTmin", [100, "-", None, [1, 2]])
+    assert result == [rdt.descale_rdt("BTmin", 100)[0], "-", None, [1, 2]]
+
+
+def test_field_labels():
+    result = rdt.field_labels("PhaseLife", [0, 4.0, 5, -1, "2", None])
+    expect = [rdt.fieldValueLUT("PhaseLife", code)
+              for code in [0, 4.0, 5, -1, "2", None]]
+    assert result == expect
+    assert result[:3] == ["Triggering", "Decaying", "-"]
@@ -115,6 +115,51 @@ def test_series_view_render():
     view.render(time, variable, x, y)
 
 
+class FakeSeriesLoader(object):
+    def __init__(self):
+        self.calls = []
+
+    def series(self, *args):
+        self.calls.append(args)
+        return {"x": [args[0]], "y": [args[2]]}
+
+
+def test_series_view_render_coalesces_bursts():
+    from test.test_main import FakeDocument, QueueExecutor
+    executor, document = QueueExecutor(), FakeDocument()
+    loaders = {"A": FakeSeriesLoader(), "B": FakeSeriesLoader()}
+    figure = bokeh.plotting.figure()
+    view = series.SeriesView(
+            figure, loaders, executor=executor, document=document)
+    time = dt.datetime(2019, 1, 1)
+    view.render(time, "mslp", 0, 0)
+    view.render(time, "mslp", 1e5, 0)
+    executor.run()
+    document.tick()
+    assert len(loaders["A"].calls) == 1
+    assert len(loaders["B"].calls) == 1
+    for source in view.sources.values():
+        assert source.data["y"][0] == pytest.approx(0.898, abs=1e-3)
+
+
+def test_series_view_discards_superseded_results():
+    from test.test_main import FakeDocument, QueueExecutor
+    executor, document = QueueExecutor(), FakeDocument()
+    loader = FakeSeriesLoader()
+    figure = bokeh.plotting.figure()
+    view = series.SeriesView(
+            figure, {"A": loader}, executor=executor, document=document)
+    time = dt.datetime(2019, 1, 1)
+    view.render(time, "mslp", 0, 0)
+    executor.run()
+    view.render(time, "mslp", 1e5, 0)
+    document.tick()
+    assert view.sources["A"].data["y"] == []
+    executor.run()
+    document.tick()
+    assert view.sources["A"].data["y"][0] == pytest.approx(0.898, abs=1e-3)
+
+
 def test_series_on_tap_emits_action():
     x, y = 1, 2  # different values to assert order
     listener = unittest.mock.Mock()
@@ -462,6 +507,25 @@ class TestSeries(unittest.TestCase):
         npt.assert_array_equal(expect["x"], result["x"])
         npt.assert_array_equal(expect["y"], result["y"])
 
+    def test_series_returns_arrays_and_caches_coordinates(self):
+        path = "test-series_20190101T0000Z.nc"
+        self.path = path
+        variable = "air_pressure_at_sea_level"
+        times = [
+                dt.datetime(2019, 1, 1),
+                dt.datetime(2019, 1, 1, 12)]
+        values = np.arange(2*3*3).reshape(2, 3, 3)
+        with netCDF4.Dataset(path, "w") as dataset:
+            variable_surface(
+                    dataset, variable, times, [0, 1, 2], [0, 1, 2], values)
+        loader = series.SeriesLoader([path])
+        for lon, lat in [(0, 1), (2, 2)]:
+            result = loader.series(dt.datetime(2019, 1, 1), variable, lon, lat)
+            npt.assert_array_equal(result["x"], times)
+            npt.assert_array_equal(result["y"], values[:, lat, lon])
+        self.assertEqual(result["x"].dtype, np.dtype("datetime64[s]"))
+        self.assertEqual(list(loader._indices.keys()), [(path, variable)])
+
     def test_series_locator(self):
         paths = [
             "/some/file_20190101T0000Z_000.nc",
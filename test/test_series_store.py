@@ -0,0 +1,94 @@
+import datetime as dt
+import os
+import pytest
+import numpy as np
+import numpy.testing as npt
+import netCDF4
+from forest import series, series_store
+from test.test_series import variable_surface, variable_4d
+
+
+@pytest.fixture
+def surface_paths(tmpdir):
+    paths = []
+    for hour in [0, 3]:
+        path = str(tmpdir / "file_20190101T0000Z_{:03d}.nc".format(hour))
+        with netCDF4.Dataset(path, "w") as dataset:
+            variable_surface(
+                dataset,
+                "air_pressure_at_sea_level",
+                [dt.datetime(2019, 1, 1, hour)],
+                [0, 1, 2],
+                [0, 1],
+                np.arange(6).reshape(1, 2, 3) + hour)
+        paths.append(path)
+    return paths
+
+
+def test_store_path(surface_paths):
+    result = series_store.store_path(surface_paths, "2019-01-01 00:00:00")
+    expect = os.path.join(
+        os.path.dirname(surface_paths[0]),
+        ".forest-series",
+        "20190101T000000Z.nc")
+    assert result == expect
+
+
+def test_convert_and_read_point(surface_paths):
+    path = series_store.store_path(surface_paths, dt.datetime(2019, 1, 1))
+    names = series_store.convert(surface_paths, path)
+    assert names == ["air_pressure_at_sea_level"]
+    assert series_store.is_current(path, surface_paths)
+    result = series_store.read_point(
+        path, "air_pressure_at_sea_level", 2, 1)
+    npt.assert_array_equal(result["x"], [
+        dt.datetime(2019, 1, 1, 0),
+        dt.datetime(2019, 1, 1, 3)])
+    npt.assert_array_equal(result["y"], [5, 8])
+
+
+def test_read_point_given_pressure(tmpdir):
+    path = str(tmpdir / "file_20190101T0000Z.nc")
+    times = [dt.datetime(2019, 1, 1), dt.datetime(2019, 1, 1, 6)]
+    values = np.arange(2*3*2*2).reshape(2, 3, 2, 2)
+    with netCDF4.Dataset(path, "w") as dataset:
+        variable_4d(dataset, "wet_bulb_potential_temperature", times,
+                    [1000., 850., 500.], [0, 1], [0, 1], values)
+    store = series_store.store_path([path], dt.datetime(2019, 1, 1))
+    series_store.convert([path], store)
+    result = series_store.read_point(
+        store, "wet_bulb_potential_temperature", 1, 0, pressure=850)
+    npt.assert_array_equal(result["y"], values[:, 1, 0, 1])
+    assert series_store.read_point(
+        store, "wet_bulb_potential_temperature", 1, 0, pressure=100) is None
+
+
+def test_series_loader_uses_current_store(surface_paths, monkeypatch):
+    path = series_store.store_path(surface_paths, dt.datetime(2019, 1, 1))
+    series_store.convert(surface_paths, path)
+    loader = series.SeriesLoader(surface_paths)
+
+    def series_file(*args, **kwargs):
+        raise AssertionError("model file read")
+
+    monkeypatch.setattr(loader, "series_file", series_file)
+    result = loader.series(
+        dt.datetime(2019, 1, 1), "air_pressure_at_sea_level", 0, 0)
+    npt.assert_array_equal(result["y"], [0, 3])
+
+
+def test_series_loader_ignores_stale_store(surface_paths):
+    path = series_store.store_path(surface_paths, dt.datetime(2019, 1, 1))
+    series_store.convert(surface_paths, path)
+    os.utime(path, (0, 0))
+    assert not series_store.is_current(path, surface_paths)
+    loader = series.SeriesLoader(surface_paths)
+    result = loader.series(
+        dt.datetime(2019, 1, 1), "air_pressure_at_sea_level", 0, 0)
+    npt.assert_array_equal(result["y"], [0, 3])
+
+
+def test_main_writes_store_per_initial_time(surface_paths):
+    series_store.main(surface_paths)
+    path = series_store.store_path(surface_paths, dt.datetime(2019, 1, 1))
+    assert os.path.exists(path)
@@ -0,0 +1,60 @@
+import pytest
+import numpy as np
+import numpy.testing as npt
+from unittest.mock import Mock
+from forest import sidecar, navigate
+from forest.exceptions import PressuresNotFound
+
+
+@pytest.fixture
+def path(tmpdir):
+    path = str(tmpdir / "file.nc")
+    with open(path, "w") as stream:
+        stream.write("data")
+    return path
+
+
+@pytest.fixture
+def cache_file(tmpdir):
+    return str(tmpdir / "cache.db")
+
+
+def test_coordinate_cache_reads_file_once(path, cache_file):
+    coordinates = Mock()
+    coordinates.valid_times.return_value = np.array(
+            ["2019-01-01"], dtype="datetime64[s]")
+    for _ in range(2):
+        cache = sidecar.CoordinateCache(coordinates, cache_file)
+        result = cache.valid_times(path, "mslp")
+    coordinates.valid_times.assert_called_once_with(path, "mslp")
+    npt.assert_array_equal(result, coordinates.valid_times.return_value)
+
+
+def test_coordinate_cache_rereads_changed_file(path, cache_file):
+    coordinates = Mock()
+    coordinates.variables.return_value = ["mslp"]
+    cache = sidecar.CoordinateCache(coordinates, cache_file)
+    cache.variables(path)
+    with open(path, "a") as stream:
+        stream.write("more data")
+    cache.variables(path)
+    assert coordinates.variables.call_count == 2
+
+
+def test_coordinate_cache_remembers_not_found(path, cache_file):
+    coordinates = Mock()
+    coordinates.pressures.side_effect = PressuresNotFound("mslp")
+    cache = sidecar.CoordinateCache(coordinates, cache_file)
+    for _ in range(2):
+        with pytest.raises(PressuresNotFound):
+            cache.pressures(path, "mslp")
+    coordinates.pressures.assert_called_once_with(path, "mslp")
+
+
+def test_navigator_given_coordinate_cache(cache_file):
+    group = Mock(locator="file_system", directory=None,
+                 pattern="*.nc", file_type="unified_model")
+    config = Mock(file_groups=[group])
+    navigator = navigate.Navigator(config, None, coordinate_cache=cache_file)
+    result = navigator._navigators["*.nc"].coordinates
+    assert isinstance(result, sidecar.CoordinateCache)